@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""Times table extraction, and the functions it spends most of its
+time in, on PDFs from tests/files.
+
+Each benchmark runs in its own process so that its memory high-water
+mark can be measured. Timings can be saved and compared with a later
+run, which fails if a benchmark got slower than a threshold.
+
+    $ python benchmarks/run.py --save baseline.json
+    $ python benchmarks/run.py --compare baseline.json --threshold 0.25
+"""
+
+from __future__ import division
+
+import os
+import sys
+import json
+import platform
+import subprocess
+import collections
+from timeit import default_timer as timer
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# benchmark the working tree, not an installed camelot
+sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+
+import camelot
+from camelot.core import Table, TextEdges
+from camelot.handlers import PDFHandler
+from camelot.image_processing import (
+    adaptive_threshold,
+    find_lines,
+    find_contours,
+    find_joints,
+)
+from camelot.parsers import Lattice, Stream
+from camelot.profiling import max_rss
+from camelot.utils import get_table_index, get_table_indices
+
+FILES = os.path.join(ROOT, "tests", "files")
+
+# PDFs parsed by the read_pdf benchmarks, all of their pages are parsed
+LATTICE_FILES = ["foo.pdf", "column_span_2.pdf", "row_span_1.pdf", "twotables_2.pdf"]
+STREAM_FILES = ["health.pdf", "budget.pdf", "superscript.pdf", "tabula/eu-017.pdf"]
+
+# pages the other benchmarks are run on
+LATTICE_PAGE = "foo.pdf"
+STREAM_PAGE = "tabula/eu-017.pdf"
+
+# minimum time spent in each repeat, the function is called as many
+# times as needed to reach it
+MIN_TIME = 0.2
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(func):
+    """Registers a benchmark. It is a function that sets up its
+    inputs, and returns the function to time along with the number
+    of pages it parses, or None if it doesn't parse whole pages.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _path(filename):
+    return os.path.join(FILES, filename)
+
+
+def _n_pages(filenames):
+    return sum(len(PDFHandler(_path(f), pages="all").pages) for f in filenames)
+
+
+def _read_pdfs(filenames, **kwargs):
+    def run():
+        for f in filenames:
+            camelot.read_pdf(_path(f), pages="all", suppress_stdout=True, **kwargs)
+
+    return run, _n_pages(filenames)
+
+
+def _parsed_page(filename, parser):
+    """Extracts tables from the first page of filename, and returns
+    the parser along with the state it reached.
+    """
+    handler = PDFHandler(_path(filename))
+    page_file, layout, __ = handler._save_page(1)
+    parser.extract_tables(page_file, suppress_stdout=True, layout=layout)
+    return parser
+
+
+def _lattice_tables():
+    """Returns tables of the lattice page with their edges set, along
+    with the text in their bounding box.
+    """
+    parser = _parsed_page(LATTICE_PAGE, Lattice(line_source="vector"))
+    tables = []
+    for table_idx, tk in enumerate(parser.table_bbox):
+        cols, rows, v_s, h_s = parser._generate_columns_and_rows(table_idx, tk)
+        tables.append((cols, rows, v_s, h_s, parser.t_bbox))
+    return parser, tables
+
+
+def _threshold(parser, resolution=300):
+    """Draws the lines of a parsed lattice page into an image like
+    the one Ghostscript renders, which isn't needed to run the image
+    processing benchmarks.
+    """
+    scale = resolution / 72
+    width = int(parser.pdf_width * scale)
+    height = int(parser.pdf_height * scale)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for x1, y1, x2, y2 in parser.vertical_segments + parser.horizontal_segments:
+        cv2.line(
+            image,
+            (int(x1 * scale), int(height - y1 * scale)),
+            (int(x2 * scale), int(height - y2 * scale)),
+            (0, 0, 0),
+            2,
+        )
+    return adaptive_threshold(image)[1]
+
+
+def _textlines():
+    parser = _parsed_page(STREAM_PAGE, Stream())
+    return sorted(parser.horizontal_text, key=lambda t: (-t.y0, t.x0))
+
+
+@benchmark
+def read_pdf_lattice():
+    return _read_pdfs(LATTICE_FILES)
+
+
+@benchmark
+def read_pdf_lattice_vector():
+    return _read_pdfs(LATTICE_FILES, line_source="vector")
+
+
+@benchmark
+def read_pdf_stream():
+    return _read_pdfs(STREAM_FILES, flavor="stream")
+
+
+@benchmark
+def find_lines_both():
+    parser, __ = _lattice_tables()
+    threshold = _threshold(parser)
+
+    def run():
+        find_lines(threshold, direction="vertical")
+        find_lines(threshold, direction="horizontal")
+
+    return run, None
+
+
+@benchmark
+def find_contours_and_joints():
+    parser, __ = _lattice_tables()
+    threshold = _threshold(parser)
+    vertical, __ = find_lines(threshold, direction="vertical")
+    horizontal, __ = find_lines(threshold, direction="horizontal")
+
+    def run():
+        contours = find_contours(vertical, horizontal)
+        find_joints(contours, vertical, horizontal)
+
+    return run, None
+
+
+@benchmark
+def table_set_edges():
+    __, tables = _lattice_tables()
+
+    def run():
+        for cols, rows, v_s, h_s, __ in tables:
+            Table(cols, rows).set_edges(v_s, h_s).set_border().set_span()
+
+    return run, None
+
+
+def _tables_with_edges():
+    __, tables = _lattice_tables()
+    return [
+        (Table(cols, rows).set_edges(v_s, h_s).set_border().set_span(), t_bbox)
+        for cols, rows, v_s, h_s, t_bbox in tables
+    ]
+
+
+@benchmark
+def table_get_table_index():
+    tables = _tables_with_edges()
+
+    def run():
+        for table, t_bbox in tables:
+            for direction in t_bbox:
+                for t in t_bbox[direction]:
+                    get_table_index(table, t, direction)
+
+    return run, None
+
+
+@benchmark
+def table_get_table_indices():
+    tables = _tables_with_edges()
+
+    def run():
+        for table, t_bbox in tables:
+            for direction in t_bbox:
+                get_table_indices(table, t_bbox[direction], direction)
+
+    return run, None
+
+
+@benchmark
+def textedges_generate():
+    textlines = _textlines()
+
+    def run():
+        TextEdges(edge_tol=50).generate(textlines)
+
+    return run, None
+
+
+@benchmark
+def stream_group_rows():
+    textlines = _textlines()
+
+    def run():
+        Stream._group_rows(textlines, row_tol=2)
+
+    return run, None
+
+
+def _time(func, repeat):
+    """Returns the lowest time per call over repeat runs, each of
+    which lasts at least MIN_TIME.
+    """
+    # also warms up caches and lazy imports
+    start = timer()
+    func()
+    elapsed = timer() - start
+    number = max(1, int(MIN_TIME / elapsed)) if elapsed > 0 else 1000
+    best = None
+    for __ in range(repeat):
+        start = timer()
+        for __ in range(number):
+            func()
+        per_call = (timer() - start) / number
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def _run_one(name, repeat):
+    func, pages = BENCHMARKS[name]()
+    seconds = _time(func, repeat)
+    result = {"time": seconds, "max_rss": max_rss()}
+    if pages is not None:
+        result["pages_per_sec"] = pages / seconds
+    return result
+
+
+def _run(name, repeat):
+    """Runs a benchmark in a new process."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--one", name, "-r", str(repeat)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        lines = err.decode("utf-8", "replace").strip().splitlines()
+        return {"error": lines[-1] if lines else "exit code {}".format(proc.returncode)}
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+
+def _format(result, base=None):
+    if "error" in result:
+        return "{:>10}  {}".format("error", result["error"])
+    columns = ["{:>10.2f}".format(result["time"] * 1000)]
+    pages_per_sec = result.get("pages_per_sec")
+    columns.append("{:>8.2f}".format(pages_per_sec) if pages_per_sec else " " * 8)
+    rss = result["max_rss"]
+    columns.append("{:>9.1f}".format(rss / 1024 ** 2) if rss is not None else " " * 9)
+    if base is not None and "error" not in base:
+        columns.append("{:>+8.1%}".format(result["time"] / base["time"] - 1))
+    return "  ".join(columns)
+
+
+def _regressions(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or "error" in base:
+            continue
+        if "error" in result:
+            regressions.append("{} failed: {}".format(name, result["error"]))
+        elif result["time"] > base["time"] * (1 + threshold):
+            regressions.append(
+                "{} is {:.1%} slower".format(name, result["time"] / base["time"] - 1)
+            )
+    return regressions
+
+
+@click.command()
+@click.option("-b", "--benchmark", "names", multiple=True, help="Benchmarks to run.")
+@click.option("-r", "--repeat", default=5, help="Number of timed runs.")
+@click.option("-s", "--save", help="Save timings to a JSON file.")
+@click.option("-c", "--compare", help="Compare timings with a saved JSON file.")
+@click.option(
+    "-t",
+    "--threshold",
+    default=0.25,
+    help="Fail if a benchmark is slower than in the compared file by more than"
+    " this fraction of its time.",
+)
+@click.option("--one", hidden=True)
+def main(names, repeat, save, compare, threshold, one):
+    """Time table extraction and its hot functions."""
+    if one is not None:
+        click.echo(json.dumps(_run_one(one, repeat)))
+        return
+
+    for name in names:
+        if name not in BENCHMARKS:
+            raise click.BadParameter("Unknown benchmark '{}'".format(name))
+    baseline = {}
+    if compare is not None:
+        with open(compare) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    header = ["benchmark", "time (ms)", "pages/s", "RSS (MB)", "change"]
+    if not baseline:
+        header.pop()
+    click.echo("{:<26}  {:>10}  {:>8}  {:>9}  {:>8}".format(*header + [""]).rstrip())
+    results = collections.OrderedDict()
+    for name in names or BENCHMARKS:
+        results[name] = _run(name, repeat)
+        row = _format(results[name], baseline.get(name))
+        click.echo("{:<26}  {}".format(name, row))
+
+    if save is not None:
+        with open(save, "w") as f:
+            json.dump(
+                {
+                    "camelot": camelot.__version__,
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "benchmarks": results,
+                },
+                f,
+                indent=2,
+            )
+
+    regressions = _regressions(results, baseline, threshold)
+    if regressions:
+        raise click.ClickException(
+            "Regressions beyond {:.0%}:\n{}".format(threshold, "\n".join(regressions))
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 import logging
 
 from .__version__ import __version__
-from .io import read_pdf
+from .io import read_pdf, read_pdfs, iter_pdf, sweep
 from .plotting import PlotMethods
 
 
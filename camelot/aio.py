@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Asyncio front-end to camelot, for Python 3.5 and later.
+
+This module isn't imported by the camelot package, import it as
+``from camelot import aio``.
+"""
+
+import os
+import asyncio
+import functools
+
+from .io import read_pdf as _read_pdf
+from .utils import is_url, download_url
+
+
+async def download(url, **download_kwargs):
+    """Download file from specified URL, without blocking the event
+    loop.
+
+    The file is written to disk as it is received, in a thread of the
+    loop's default executor.
+
+    Parameters
+    ----------
+    url : str
+    download_kwargs : dict
+        See camelot.utils.download_url kwargs.
+
+    Returns
+    -------
+    filepath : str
+        Temporary filepath.
+
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(download_url, url, **download_kwargs)
+    )
+
+
+async def read_pdf(filepath, executor=None, download_kwargs={}, **kwargs):
+    """Read PDF and return extracted tables, without blocking the
+    event loop.
+
+    URLs are downloaded with :func:`download`, and pages are parsed in
+    an executor, so that many PDFs can be read at the same time.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath or URL of the PDF file.
+    executor : concurrent.futures.Executor, optional (default: None)
+        Executor in which the PDF is parsed, the loop's default
+        executor if not specified. Parsing is CPU-bound, use a
+        concurrent.futures.ProcessPoolExecutor to parse PDFs in
+        parallel.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used if filepath
+        is a URL. The downloaded file is removed once it is parsed.
+    kwargs : dict
+        See camelot.read_pdf kwargs.
+
+    Returns
+    -------
+    tables : camelot.core.TableList
+
+    """
+    if not is_url(filepath):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(_read_pdf, filepath, **kwargs)
+        )
+
+    url = filepath
+    filepath = await download(url, **download_kwargs)
+    try:
+        tables = await read_pdf(filepath, executor=executor, **kwargs)
+    finally:
+        os.remove(filepath)
+    for table in tables:
+        if table._debug_loader is not None:
+            # plotting data is regenerated from the URL, the
+            # downloaded file is gone by then
+            table._debug_loader.filepath = url
+            table._debug_loader.download_kwargs = download_kwargs
+    return tables
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+from .__version__ import __version__
+
+
+# stages of an extraction whose results are cached, each one depends
+# on the ones before it
+LAYERS = ["layout", "image", "segments", "tables"]
+
+# default size limits in bytes
+MAX_SIZE = {
+    "layout": 256 * 1024 * 1024,
+    "image": 1024 * 1024 * 1024,
+    "segments": 64 * 1024 * 1024,
+    "tables": 256 * 1024 * 1024,
+}
+
+# a layer that outgrows its maximum size is trimmed down to this
+# fraction of it, so that it is only scanned again once that much
+# has been written
+LOW_WATER = 0.9
+
+
+def file_hash(filepath):
+    """Returns the SHA-256 hex digest of a file's contents.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath of the file.
+
+    Returns
+    -------
+    digest : str
+
+    """
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _normalize(obj):
+    # dicts and lists are turned into tuples so that equal parameters
+    # always have the same repr
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_normalize(v) for v in obj)
+    return obj
+
+
+def make_key(*parts):
+    """Returns a key for the given parts, which can be nested dicts,
+    lists and scalars. Keys also depend on the camelot version, so
+    that results pickled by another version are never reused.
+
+    Returns
+    -------
+    key : str
+
+    """
+    parts = (__version__,) + parts
+    return hashlib.sha256(repr(_normalize(parts)).encode("utf-8")).hexdigest()
+
+
+class Cache(object):
+    """On-disk cache of extraction results, stored as a directory of
+    pickles with one subdirectory per layer.
+
+    Each layer is bounded in size, the least recently used entries
+    are removed when a new entry doesn't fit. Entries are written
+    atomically so that a cache directory can be shared by multiple
+    processes.
+
+    The size of each layer is kept as a running total of the entries
+    written, the layer directory is only scanned on the first write
+    and when the total outgrows the maximum size. Entries written by
+    other processes are accounted for at those scans.
+
+    Parameters
+    ----------
+    cachedir : str
+        Directory in which the cache is kept, created if it doesn't
+        exist.
+    max_size : dict, optional (default: None)
+        Dict mapping layer names to their maximum size in bytes.
+        Layers not present in it use the default sizes from MAX_SIZE.
+
+    """
+
+    def __init__(self, cachedir, max_size=None):
+        self.cachedir = cachedir
+        self.max_size = dict(MAX_SIZE, **(max_size or {}))
+        # running totals of the layer sizes, in bytes
+        self._sizes = {}
+        for layer in LAYERS:
+            layerdir = os.path.join(cachedir, layer)
+            if not os.path.isdir(layerdir):
+                os.makedirs(layerdir)
+
+    def _path(self, layer, key):
+        if layer not in LAYERS:
+            raise ValueError("Unknown cache layer '{}'".format(layer))
+        return os.path.join(self.cachedir, layer, "{}.pkl".format(key))
+
+    def has(self, layer, key):
+        """Checks whether an entry is present, without loading it.
+        """
+        return os.path.exists(self._path(layer, key))
+
+    def get(self, layer, key):
+        """Returns a cached entry, None if it isn't present.
+        """
+        path = self._path(layer, key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            # missing or unreadable entries are recomputed
+            return None
+        try:
+            # the modification time tells which entries were used last
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, layer, key, value):
+        """Stores an entry and evicts least recently used entries of
+        the layer if it grows too large.
+        """
+        path = self._path(layer, key)
+        try:
+            # an entry that is replaced no longer counts
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        fd, tmppath = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        if os.name == "nt" and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmppath, path)
+        if layer in self._sizes:
+            self._sizes[layer] += size - old_size
+        else:
+            self._sizes[layer] = sum(e[1] for e in self._entries(layer))
+        if self._sizes[layer] > self.max_size[layer]:
+            self._evict(layer)
+
+    def _entries(self, layer):
+        """Returns the entries of a layer as tuples of the form
+        (mtime, size, name).
+        """
+        layerdir = os.path.join(self.cachedir, layer)
+        entries = []
+        for name in os.listdir(layerdir):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                stat = os.stat(os.path.join(layerdir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self, layer):
+        layerdir = os.path.join(self.cachedir, layer)
+        entries = self._entries(layer)
+        size = sum(e[1] for e in entries)
+        if size > self.max_size[layer]:
+            for mtime, entry_size, name in sorted(entries):
+                if size <= self.max_size[layer] * LOW_WATER:
+                    break
+                try:
+                    os.remove(os.path.join(layerdir, name))
+                except OSError:
+                    # removed by another process
+                    pass
+                size -= entry_size
+        self._sizes[layer] = size
+
+    def clear(self, layer=None):
+        """Removes all entries, or only those of a layer.
+        """
+        for l in LAYERS if layer is None else [layer]:
+            self._sizes.pop(l, None)
+            layerdir = os.path.join(self.cachedir, l)
+            for name in os.listdir(layerdir):
+                try:
+                    os.remove(os.path.join(layerdir, name))
+                except OSError:
+                    pass
+
+
+class PageCache(object):
+    """Cache entries of a page of a document, for a given set of
+    layout_kwargs.
+
+    Parameters
+    ----------
+    cache : camelot.cache.Cache
+    doc_key : str
+        Hash of the document's contents.
+    page : int
+        Page number.
+    layout_kwargs : dict
+        A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+
+    """
+
+    def __init__(self, cache, doc_key, page, layout_kwargs):
+        self.cache = cache
+        # the layout, and the rotation of the page that is rendered,
+        # depend on layout_kwargs so every layer does as well
+        self.page_key = (doc_key, page, layout_kwargs)
+
+    def _key(self, layer, params):
+        return make_key(self.page_key, layer, params)
+
+    def has(self, layer, params={}):
+        return self.cache.has(layer, self._key(layer, params))
+
+    def get(self, layer, params={}):
+        return self.cache.get(layer, self._key(layer, params))
+
+    def set(self, layer, value, params={}):
+        self.cache.set(layer, self._key(layer, params), value)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import os
 import logging
+import collections
 
 import click
 
@@ -11,7 +13,7 @@ except ImportError:
 else:
     _HAS_MPL = True
 
-from . import __version__, read_pdf, plot
+from . import __version__, read_pdf, read_pdfs, plot
 
 
 logger = logging.getLogger("camelot")
@@ -39,6 +41,13 @@ pass_config = click.make_pass_decorator(Config)
     help="Comma-separated page numbers." " Example: 1,3,4 or 1,4-end or all.",
 )
 @click.option("-pw", "--password", help="Password for decryption.")
+@click.option(
+    "-w",
+    "--workers",
+    type=int,
+    help="Number of processes used to parse pages in parallel."
+    " [default: 1, or the number of CPUs for batch]",
+)
 @click.option("-o", "--output", help="Output file path.")
 @click.option(
     "-f",
@@ -77,6 +86,9 @@ def cli(ctx, *args, **kwargs):
     """Camelot: PDF Table Extraction for Humans"""
     ctx.obj = Config()
     for key, value in kwargs.items():
+        # each command falls back to its own default
+        if key == "workers" and value is None:
+            continue
         ctx.obj.set_config(key, value)
 
 
@@ -161,8 +173,16 @@ def cli(ctx, *args, **kwargs):
 @click.option(
     "-res",
     "--resolution",
-    default=300,
-    help="Resolution used for PDF to PNG conversion.",
+    default="300",
+    help="Resolution used for PDF to PNG conversion, or 'auto'.",
+)
+@click.option(
+    "-src",
+    "--line_source",
+    type=click.Choice(["raster", "vector", "auto"]),
+    default="raster",
+    help="Detect lines in an image of the page, in the lines drawn in the"
+    " PDF, or in the drawn lines first and the image if no table is found.",
 )
 @click.option(
     "-plot",
@@ -191,6 +211,13 @@ def lattice(c, *args, **kwargs):
     copy_text = list(kwargs["copy_text"])
     kwargs["copy_text"] = None if not copy_text else copy_text
     kwargs["shift_text"] = list(kwargs["shift_text"])
+    if kwargs["resolution"] != "auto":
+        try:
+            kwargs["resolution"] = int(kwargs["resolution"])
+        except ValueError:
+            raise click.BadParameter(
+                "should be an integer or 'auto'", param_hint="--resolution"
+            )
 
     if plot_type is not None:
         if not _HAS_MPL:
@@ -302,3 +329,74 @@ def stream(c, *args, **kwargs):
             plt.show()
     else:
         tables.export(output, f=f, compress=compress)
+
+
+# extensions of the files written for each output format
+_EXTENSIONS = {
+    "csv": "csv",
+    "json": "json",
+    "excel": "xlsx",
+    "html": "html",
+    "sqlite": "db",
+}
+
+
+@cli.command("batch")
+@click.option(
+    "-F",
+    "--flavor",
+    default="lattice",
+    type=click.Choice(["lattice", "stream"]),
+    help="The parsing method to use.",
+)
+@click.option(
+    "-t",
+    "--timeout",
+    type=float,
+    help="Maximum number of seconds to wait for a PDF"
+    " once all PDFs before it are done.",
+)
+@click.argument("filepaths", nargs=-1, type=click.Path())
+@pass_config
+def batch(c, *args, **kwargs):
+    """Parse many PDFs on one pool of processes."""
+    conf = c.config
+    pages = conf.pop("pages")
+    output = conf.pop("output")
+    f = conf.pop("format")
+    compress = conf.pop("zip")
+    quiet = conf.pop("quiet")
+    flavor = kwargs.pop("flavor")
+    filepaths = kwargs.pop("filepaths")
+    kwargs.update(conf)
+
+    if output is None:
+        raise click.UsageError("Please specify output directory using --output")
+    if f is None:
+        raise click.UsageError("Please specify output file format using --format")
+    # output files are named after the PDFs
+    roots = [os.path.splitext(os.path.basename(fp))[0] for fp in filepaths]
+    counts = collections.Counter(roots)
+    duplicates = [fp for fp, root in zip(filepaths, roots) if counts[root] > 1]
+    if duplicates:
+        raise click.UsageError(
+            "PDFs with the same name would overwrite each other's output: {}".format(
+                ", ".join(duplicates)
+            )
+        )
+
+    n_failed = 0
+    results = read_pdfs(
+        filepaths, pages=pages, flavor=flavor, suppress_stdout=quiet, **kwargs
+    )
+    for filepath, tables in results:
+        if isinstance(tables, Exception):
+            n_failed += 1
+            click.echo("{}: failed: {}".format(filepath, tables))
+            continue
+        root, __ = os.path.splitext(os.path.basename(filepath))
+        path = os.path.join(output, "{}.{}".format(root, _EXTENSIONS[f]))
+        tables.export(path, f=f, compress=compress)
+        click.echo("{}: found {} tables".format(filepath, tables.n))
+    if n_failed:
+        raise click.ClickException("{} PDFs could not be parsed".format(n_failed))
@@ -4,6 +4,7 @@ import os
 import sqlite3
 import zipfile
 import tempfile
+from bisect import bisect_left, bisect_right
 from itertools import chain
 from operator import itemgetter
 
@@ -83,6 +84,9 @@ class TextEdges(object):
     def __init__(self, edge_tol=50):
         self.edge_tol = edge_tol
         self._textedges = {"left": [], "right": [], "middle": []}
+        # x coordinates of the text edges of each alignment in sorted
+        # order, along with the index of each edge in _textedges
+        self._x_index = {"left": ([], []), "right": ([], []), "middle": ([], [])}
 
     @staticmethod
     def get_x_coord(textline, align):
@@ -99,10 +103,23 @@ class TextEdges(object):
         """Returns the index of an existing text edge using
         the specified x coordinate and alignment.
         """
-        for i, te in enumerate(self._textedges[align]):
-            if np.isclose(te.x, x_coord, atol=0.5):
-                return i
-        return None
+        xs, indices = self._x_index[align]
+        # same as np.isclose(te.x, x_coord, atol=0.5), edges within
+        # tol of x_coord are next to each other in sorted order
+        tol = 0.5 + 1e-05 * abs(x_coord)
+
+        def close(x):
+            return abs(x - x_coord) <= tol
+
+        lo = bisect_left(xs, x_coord - tol)
+        while lo > 0 and close(xs[lo - 1]):
+            lo -= 1
+        hi = bisect_right(xs, x_coord + tol)
+        while hi < len(xs) and close(xs[hi]):
+            hi += 1
+        # the first edge that was added wins, like a scan would
+        found = [indices[k] for k in range(lo, hi) if close(xs[k])]
+        return min(found) if found else None
 
     def add(self, textline, align):
         """Adds a new text edge to the current dict.
@@ -112,6 +129,21 @@ class TextEdges(object):
         y1 = textline.y1
         te = TextEdge(x, y0, y1, align=align)
         self._textedges[align].append(te)
+        self._insert(align, x, len(self._textedges[align]) - 1)
+
+    def _insert(self, align, x, idx):
+        xs, indices = self._x_index[align]
+        k = bisect_right(xs, x)
+        xs.insert(k, x)
+        indices.insert(k, idx)
+
+    def _remove(self, align, x, idx):
+        xs, indices = self._x_index[align]
+        k = bisect_left(xs, x)
+        while indices[k] != idx:
+            k += 1
+        del xs[k]
+        del indices[k]
 
     def update(self, textline):
         """Updates an existing text edge in the current dict.
@@ -122,9 +154,13 @@ class TextEdges(object):
             if idx is None:
                 self.add(textline, align)
             else:
-                self._textedges[align][idx].update_coords(
-                    x_coord, textline.y0, edge_tol=self.edge_tol
-                )
+                te = self._textedges[align][idx]
+                x = te.x
+                te.update_coords(x_coord, textline.y0, edge_tol=self.edge_tol)
+                if te.x != x:
+                    # the edge moved to the mean x of its text rows
+                    self._remove(align, x, idx)
+                    self._insert(align, te.x, idx)
 
     def generate(self, textlines):
         """Generates the text edges dict based on horizontal text
@@ -157,6 +193,116 @@ class TextEdges(object):
         relevant_align = max(intersections_sum.items(), key=itemgetter(1))[0]
         return self._textedges[relevant_align]
 
+    @staticmethod
+    def _group_textedges(textedges):
+        """Groups valid text edges that overlap vertically into table
+        areas, sweeping over the edges from top to bottom.
+
+        An edge is merged into the area that was created or grown the
+        least recently among the ones it overlaps. As edges come in
+        decreasing order of y0, that area is found with a binary
+        search, since the bottom of each area is the y0 of the last
+        edge it got.
+
+        Returns
+        -------
+        table_areas : list
+            List of (x0, y0, x1, y1) tuples, the least recently grown
+            area first.
+
+        """
+        areas = []
+        # negated bottoms of areas, which are in increasing order
+        bottoms = []
+        keys = set()
+        for te in textedges:
+            if not te.is_valid:
+                continue
+            # an area overlaps te if its bottom is below te's top, the
+            # top of an area is always above te's bottom
+            k = bisect_left(bottoms, -te.y1)
+            if k == len(areas):
+                area = (te.x, te.y0, te.x, te.y1)
+            else:
+                found = areas.pop(k)
+                bottoms.pop(k)
+                keys.discard(found)
+                area = (
+                    found[0],
+                    min(te.y0, found[1]),
+                    max(found[2], te.x),
+                    max(found[3], te.y1),
+                )
+            # areas that end up equal are one and the same
+            if area not in keys:
+                keys.add(area)
+                areas.append(area)
+                bottoms.append(-area[1])
+        return areas
+
+    @staticmethod
+    def _extend_table_areas(table_areas, textlines):
+        """Grows table areas horizontally to include the textlines
+        that lie within their vertical extent.
+
+        A textline is added to the area that was grown the least
+        recently among the ones that contain it. Textlines don't
+        change the vertical extent of areas, so candidate areas are
+        looked up with a binary search on their sorted bottoms.
+
+        Parameters
+        ----------
+        table_areas : list
+            List of (x0, y0, x1, y1) tuples, the least recently grown
+            area first.
+        textlines : list
+            List of PDFMiner text objects.
+
+        Returns
+        -------
+        table_areas : list
+            List of (x0, y0, x1, y1) tuples, the least recently grown
+            area first.
+
+        """
+        areas = [list(area) for area in table_areas]
+        # when each area was last grown
+        grown = list(range(len(areas)))
+        alive = [True] * len(areas)
+        keys = {tuple(area): i for i, area in enumerate(areas)}
+
+        by_bottom = sorted(range(len(areas)), key=lambda i: areas[i][1])
+        bottoms = [areas[i][1] for i in by_bottom]
+        # highest top among the areas up to each position
+        reach = []
+        for i in by_bottom:
+            reach.append(max(reach[-1], areas[i][3]) if reach else areas[i][3])
+
+        for n, tl in enumerate(textlines, len(areas)):
+            found = None
+            for k in range(bisect_right(bottoms, tl.y0) - 1, -1, -1):
+                if reach[k] < tl.y1:
+                    break
+                i = by_bottom[k]
+                if alive[i] and tl.y1 <= areas[i][3]:
+                    if found is None or grown[i] < grown[found]:
+                        found = i
+            if found is None:
+                continue
+            area = areas[found]
+            del keys[tuple(area)]
+            area[0] = min(tl.x0, area[0])
+            area[2] = max(area[2], tl.x1)
+            if tuple(area) in keys:
+                # areas that end up equal are one and the same
+                alive[found] = False
+            else:
+                keys[tuple(area)] = found
+                grown[found] = n
+
+        order = sorted(range(len(areas)), key=grown.__getitem__)
+        return [tuple(areas[i]) for i in order if alive[i]]
+
     def get_table_areas(self, textlines, relevant_textedges):
         """Returns a dict of interesting table areas on the PDF page
         calculated using relevant text edges.
@@ -172,30 +318,7 @@ class TextEdges(object):
 
         # sort relevant textedges in reading order
         relevant_textedges.sort(key=lambda te: (-te.y0, te.x))
-
-        table_areas = {}
-        for te in relevant_textedges:
-            if te.is_valid:
-                if not table_areas:
-                    table_areas[(te.x, te.y0, te.x, te.y1)] = None
-                else:
-                    found = None
-                    for area in table_areas:
-                        # check for overlap
-                        if te.y1 >= area[1] and te.y0 <= area[3]:
-                            found = area
-                            break
-                    if found is None:
-                        table_areas[(te.x, te.y0, te.x, te.y1)] = None
-                    else:
-                        table_areas.pop(found)
-                        updated_area = (
-                            found[0],
-                            min(te.y0, found[1]),
-                            max(found[2], te.x),
-                            max(found[3], te.y1),
-                        )
-                        table_areas[updated_area] = None
+        table_areas = self._group_textedges(relevant_textedges)
 
         # extend table areas based on textlines that overlap
         # vertically. it's possible that these textlines were
@@ -203,24 +326,8 @@ class TextEdges(object):
         # chars/words/sentences are often aligned differently.
         # drawback: table areas that have paragraphs on their sides
         # will include the paragraphs too.
-        sum_textline_height = 0
-        for tl in textlines:
-            sum_textline_height += tl.y1 - tl.y0
-            found = None
-            for area in table_areas:
-                # check for overlap
-                if tl.y0 >= area[1] and tl.y1 <= area[3]:
-                    found = area
-                    break
-            if found is not None:
-                table_areas.pop(found)
-                updated_area = (
-                    min(tl.x0, found[0]),
-                    min(tl.y0, found[1]),
-                    max(found[2], tl.x1),
-                    max(found[3], tl.y1),
-                )
-                table_areas[updated_area] = None
+        table_areas = self._extend_table_areas(table_areas, textlines)
+        sum_textline_height = sum(tl.y1 - tl.y0 for tl in textlines)
         average_textline_height = sum_textline_height / float(len(textlines))
 
         # add some padding to table areas
@@ -231,10 +338,84 @@ class TextEdges(object):
         return table_areas_padded
 
 
+def _snap(values, coords, tol):
+    """Finds the coordinates that values are close to, within a
+    tolerance, using the same comparison as np.isclose.
+
+    Candidate coordinates are looked up with a binary search on the
+    sorted coordinates and then compared exactly, which avoids
+    comparing every value with every coordinate.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values to snap.
+    coords : np.ndarray
+        Coordinates, in any order.
+    tol : float
+        Absolute tolerance.
+
+    Returns
+    -------
+    first : np.ndarray
+        Index of the first coordinate that each value is close to, -1
+        if there's none.
+    count : np.ndarray
+        Number of coordinates that each value is close to.
+
+    """
+    first = np.full(len(values), -1, dtype=int)
+    count = np.zeros(len(values), dtype=int)
+    if not len(values) or not len(coords):
+        return first, count
+    order = np.argsort(coords, kind="mergesort")
+    sorted_coords = coords[order]
+    # widest window that can contain a close coordinate, np.isclose
+    # also allows for a relative difference
+    slack = tol + 1e-05 * np.abs(coords).max()
+    lo = np.searchsorted(sorted_coords, values - slack, side="left")
+    hi = np.searchsorted(sorted_coords, values + slack, side="right")
+    width = (hi - lo).max()
+    if width == 0:
+        return first, count
+    pos = lo[:, np.newaxis] + np.arange(width)
+    valid = pos < hi[:, np.newaxis]
+    candidates = order[np.minimum(pos, len(coords) - 1)]
+    close = valid & np.isclose(values[:, np.newaxis], coords[candidates], atol=tol)
+    count = close.sum(axis=1)
+    first = np.where(close, candidates, len(coords)).min(axis=1)
+    first[count == 0] = -1
+    return first, count
+
+
+def _new_grid(shape):
+    """Returns the arrays that hold the state of a grid of cells.
+    """
+    grid = {
+        name: np.zeros(shape, dtype=bool)
+        for name in ["left", "right", "top", "bottom", "hspan", "vspan"]
+    }
+    grid["text"] = np.full(shape, "", dtype=object)
+    return grid
+
+
+def _grid_property(name, doc):
+    def fget(self):
+        return bool(self._grid[name][self._r, self._c])
+
+    def fset(self, value):
+        self._grid[name][self._r, self._c] = value
+
+    return property(fget, fset, doc=doc)
+
+
 class Cell(object):
     """Defines a cell in a table with coordinates relative to a
     left-bottom origin. (PDF coordinate space)
 
+    Cells of a table are views on the table's arrays, setting an
+    attribute of a cell updates the table.
+
     Parameters
     ----------
     x1 : float
@@ -273,35 +454,66 @@ class Cell(object):
 
     """
 
+    __slots__ = ("x1", "y1", "x2", "y2", "_grid", "_r", "_c")
+
     def __init__(self, x1, y1, x2, y2):
         self.x1 = x1
         self.y1 = y1
         self.x2 = x2
         self.y2 = y2
-        self.lb = (x1, y1)
-        self.lt = (x1, y2)
-        self.rb = (x2, y1)
-        self.rt = (x2, y2)
-        self.left = False
-        self.right = False
-        self.top = False
-        self.bottom = False
-        self.hspan = False
-        self.vspan = False
-        self._text = ""
+        self._grid = _new_grid((1, 1))
+        self._r = 0
+        self._c = 0
+
+    @classmethod
+    def _from_grid(cls, grid, r, c, x1, y1, x2, y2):
+        cell = cls.__new__(cls)
+        cell.x1 = x1
+        cell.y1 = y1
+        cell.x2 = x2
+        cell.y2 = y2
+        cell._grid = grid
+        cell._r = r
+        cell._c = c
+        return cell
 
     def __repr__(self):
         return "<Cell x1={} y1={} x2={} y2={}>".format(
             round(self.x1, 2), round(self.y1, 2), round(self.x2, 2), round(self.y2, 2)
         )
 
+    @property
+    def lb(self):
+        return (self.x1, self.y1)
+
+    @property
+    def lt(self):
+        return (self.x1, self.y2)
+
+    @property
+    def rb(self):
+        return (self.x2, self.y1)
+
+    @property
+    def rt(self):
+        return (self.x2, self.y2)
+
+    left = _grid_property("left", "Whether or not cell is bounded on the left.")
+    right = _grid_property("right", "Whether or not cell is bounded on the right.")
+    top = _grid_property("top", "Whether or not cell is bounded on the top.")
+    bottom = _grid_property(
+        "bottom", "Whether or not cell is bounded on the bottom."
+    )
+    hspan = _grid_property("hspan", "Whether or not cell spans horizontally.")
+    vspan = _grid_property("vspan", "Whether or not cell spans vertically.")
+
     @property
     def text(self):
-        return self._text
+        return self._grid["text"][self._r, self._c]
 
     @text.setter
     def text(self, t):
-        self._text = "".join([self._text, t])
+        self._grid["text"][self._r, self._c] = "".join([self.text, t])
 
     @property
     def bound(self):
@@ -342,13 +554,20 @@ class Table(object):
     def __init__(self, cols, rows):
         self.cols = cols
         self.rows = rows
-        self.cells = [[Cell(c[0], r[1], c[1], r[0]) for c in cols] for r in rows]
+        # cell edges, spans and text are kept in arrays of shape
+        # (len(rows), len(cols)), cells are only created on access
+        self._grid = _new_grid((len(rows), len(cols)))
+        self._cells = None
         self.df = None
         self.shape = (0, 0)
         self.accuracy = 0
         self.whitespace = 0
         self.order = None
         self.page = None
+        # regenerates the data used for plotting when it wasn't kept
+        self._debug_loader = None
+        # stages in which the page was parsed, when profiled
+        self._profile = None
 
     def __repr__(self):
         return "<{} shape={}>".format(self.__class__.__name__, self.shape)
@@ -360,19 +579,31 @@ class Table(object):
         if self.page < other.page:
             return True
 
+    @property
+    def cells(self):
+        """Returns two-dimensional list of cells in table.
+        """
+        if self._cells is None:
+            self._cells = [
+                [
+                    Cell._from_grid(self._grid, i, j, c[0], r[1], c[1], r[0])
+                    for j, c in enumerate(self.cols)
+                ]
+                for i, r in enumerate(self.rows)
+            ]
+        return self._cells
+
     @property
     def data(self):
         """Returns two-dimensional list of strings in table.
         """
-        d = []
-        for row in self.cells:
-            d.append([cell.text.strip() for cell in row])
-        return d
+        return [[text.strip() for text in row] for row in self._grid["text"].tolist()]
 
     @property
     def parsing_report(self):
         """Returns a parsing report with %accuracy, %whitespace,
-        table number on page and page number.
+        table number on page and page number, along with the stages
+        in which the page was parsed if it was profiled.
         """
         # pretty?
         report = {
@@ -381,14 +612,26 @@ class Table(object):
             "order": self.order,
             "page": self.page,
         }
+        # tables pickled before profiling existed don't have it
+        if self._profile is not None:
+            report["profile"] = self._profile
         return report
 
+    def _load_debug(self):
+        """Regenerates the data used for plotting if it wasn't kept
+        when the table was extracted.
+        """
+        if self._debug_loader is not None:
+            for attr, value in self._debug_loader(self).items():
+                setattr(self, attr, value)
+            self._debug_loader = None
+        return self
+
     def set_all_edges(self):
         """Sets all table edges to True.
         """
-        for row in self.cells:
-            for cell in row:
-                cell.left = cell.right = cell.top = cell.bottom = True
+        for edge in ["left", "right", "top", "bottom"]:
+            self._grid[edge][:] = True
         return self
 
     def set_edges(self, vertical, horizontal, joint_tol=2):
@@ -404,168 +647,85 @@ class Table(object):
             List of detected horizontal lines.
 
         """
-        for v in vertical:
-            # find closest x coord
-            # iterate over y coords and find closest start and end points
-            i = [
-                i
-                for i, t in enumerate(self.cols)
-                if np.isclose(v[0], t[0], atol=joint_tol)
-            ]
-            j = [
-                j
-                for j, t in enumerate(self.rows)
-                if np.isclose(v[3], t[0], atol=joint_tol)
-            ]
-            k = [
-                k
-                for k, t in enumerate(self.rows)
-                if np.isclose(v[1], t[0], atol=joint_tol)
-            ]
-            if not j:
+        left = self._grid["left"]
+        right = self._grid["right"]
+        top = self._grid["top"]
+        bottom = self._grid["bottom"]
+        cols = np.array([c[0] for c in self.cols], dtype=float)
+        rows = np.array([r[0] for r in self.rows], dtype=float)
+
+        # snap all segment endpoints to column and row indices at once
+        vertical = np.array(vertical, dtype=float).reshape(-1, 4)
+        i, n_i = _snap(vertical[:, 0], cols, joint_tol)
+        j, _ = _snap(vertical[:, 3], rows, joint_tol)
+        k, _ = _snap(vertical[:, 1], rows, joint_tol)
+        for L, n_L, J, K in zip(i, n_i, j, k):
+            # start and end points are the closest y coords
+            if J == -1:
                 continue
-            J = j[0]
-            if i == [0]:  # only left edge
-                L = i[0]
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[J][L].left = True
-                        J += 1
-                else:
-                    K = len(self.rows)
-                    while J < K:
-                        self.cells[J][L].left = True
-                        J += 1
-            elif i == []:  # only right edge
-                L = len(self.cols) - 1
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[J][L].right = True
-                        J += 1
-                else:
-                    K = len(self.rows)
-                    while J < K:
-                        self.cells[J][L].right = True
-                        J += 1
+            if K == -1:
+                K = len(self.rows)
+            if L == 0 and n_L == 1:  # only left edge
+                left[J:K, 0] = True
+            elif L == -1:  # only right edge
+                right[J:K, len(self.cols) - 1] = True
             else:  # both left and right edges
-                L = i[0]
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[J][L].left = True
-                        self.cells[J][L - 1].right = True
-                        J += 1
-                else:
-                    K = len(self.rows)
-                    while J < K:
-                        self.cells[J][L].left = True
-                        self.cells[J][L - 1].right = True
-                        J += 1
-
-        for h in horizontal:
-            # find closest y coord
-            # iterate over x coords and find closest start and end points
-            i = [
-                i
-                for i, t in enumerate(self.rows)
-                if np.isclose(h[1], t[0], atol=joint_tol)
-            ]
-            j = [
-                j
-                for j, t in enumerate(self.cols)
-                if np.isclose(h[0], t[0], atol=joint_tol)
-            ]
-            k = [
-                k
-                for k, t in enumerate(self.cols)
-                if np.isclose(h[2], t[0], atol=joint_tol)
-            ]
-            if not j:
+                left[J:K, L] = True
+                right[J:K, L - 1] = True
+
+        horizontal = np.array(horizontal, dtype=float).reshape(-1, 4)
+        i, n_i = _snap(horizontal[:, 1], rows, joint_tol)
+        j, _ = _snap(horizontal[:, 0], cols, joint_tol)
+        k, _ = _snap(horizontal[:, 2], cols, joint_tol)
+        for L, n_L, J, K in zip(i, n_i, j, k):
+            # start and end points are the closest x coords
+            if J == -1:
                 continue
-            J = j[0]
-            if i == [0]:  # only top edge
-                L = i[0]
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[L][J].top = True
-                        J += 1
-                else:
-                    K = len(self.cols)
-                    while J < K:
-                        self.cells[L][J].top = True
-                        J += 1
-            elif i == []:  # only bottom edge
-                L = len(self.rows) - 1
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[L][J].bottom = True
-                        J += 1
-                else:
-                    K = len(self.cols)
-                    while J < K:
-                        self.cells[L][J].bottom = True
-                        J += 1
+            if K == -1:
+                K = len(self.cols)
+            if L == 0 and n_L == 1:  # only top edge
+                top[0, J:K] = True
+            elif L == -1:  # only bottom edge
+                bottom[len(self.rows) - 1, J:K] = True
             else:  # both top and bottom edges
-                L = i[0]
-                if k:
-                    K = k[0]
-                    while J < K:
-                        self.cells[L][J].top = True
-                        self.cells[L - 1][J].bottom = True
-                        J += 1
-                else:
-                    K = len(self.cols)
-                    while J < K:
-                        self.cells[L][J].top = True
-                        self.cells[L - 1][J].bottom = True
-                        J += 1
+                top[L, J:K] = True
+                bottom[L - 1, J:K] = True
 
         return self
 
     def set_border(self):
         """Sets table border edges to True.
         """
-        for r in range(len(self.rows)):
-            self.cells[r][0].left = True
-            self.cells[r][len(self.cols) - 1].right = True
-        for c in range(len(self.cols)):
-            self.cells[0][c].top = True
-            self.cells[len(self.rows) - 1][c].bottom = True
+        self._grid["left"][:, 0] = True
+        self._grid["right"][:, len(self.cols) - 1] = True
+        self._grid["top"][0, :] = True
+        self._grid["bottom"][len(self.rows) - 1, :] = True
         return self
 
     def set_span(self):
         """Sets a cell's hspan or vspan attribute to True depending
         on whether the cell spans horizontally or vertically.
         """
-        for row in self.cells:
-            for cell in row:
-                left = cell.left
-                right = cell.right
-                top = cell.top
-                bottom = cell.bottom
-                if cell.bound == 4:
-                    continue
-                elif cell.bound == 3:
-                    if not left and (right and top and bottom):
-                        cell.hspan = True
-                    elif not right and (left and top and bottom):
-                        cell.hspan = True
-                    elif not top and (left and right and bottom):
-                        cell.vspan = True
-                    elif not bottom and (left and right and top):
-                        cell.vspan = True
-                elif cell.bound == 2:
-                    if left and right and (not top and not bottom):
-                        cell.vspan = True
-                    elif top and bottom and (not left and not right):
-                        cell.hspan = True
-                elif cell.bound in [0, 1]:
-                    cell.vspan = True
-                    cell.hspan = True
+        left = self._grid["left"]
+        right = self._grid["right"]
+        top = self._grid["top"]
+        bottom = self._grid["bottom"]
+        bound = (
+            left.astype(int) + right.astype(int) + top.astype(int) + bottom.astype(int)
+        )
+
+        # cells bounded on three sides span towards the open side
+        hspan = (bound == 3) & ((~left & right) | (~right & left)) & top & bottom
+        vspan = (bound == 3) & ((~top & bottom) | (~bottom & top)) & left & right
+        # cells bounded on two opposite sides span along them
+        vspan |= (bound == 2) & left & right & ~top & ~bottom
+        hspan |= (bound == 2) & top & bottom & ~left & ~right
+        # cells bounded on one side or less span both ways
+        hspan |= bound <= 1
+        vspan |= bound <= 1
+
+        self._grid["hspan"] |= hspan
+        self._grid["vspan"] |= vspan
         return self
 
     def to_csv(self, path, **kwargs):
@@ -1,26 +1,246 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import sys
+import math
+import time
+import warnings
+import collections
+import multiprocessing
 
 from PyPDF2 import PdfFileReader, PdfFileWriter
+from PyPDF2.utils import PdfReadError
 
 from .core import TableList
+from .cache import Cache, PageCache, file_hash
 from .parsers import Stream, Lattice
+from .profiling import Profiler, stage
+from .rasterizer import Rasterizer
 from .utils import (
     TemporaryDirectory,
     get_page_layout,
-    get_text_objects,
+    flatten_layout,
     get_rotation,
     is_url,
     download_url,
 )
 
 
+def _write_page(page, name):
+    """Writes a PyPDF2 PageObject into an in-memory single page PDF.
+    """
+    outfile = PdfFileWriter()
+    outfile.addPage(page)
+    page_file = io.BytesIO()
+    outfile.write(page_file)
+    page_file.name = name
+    page_file.seek(0)
+    return page_file
+
+
+def _rotate_page(page_file, rotation):
+    """Rotates an in-memory single page PDF so that its text is
+    horizontal.
+    """
+    infile = PdfFileReader(page_file, strict=False)
+    p = infile.getPage(0)
+    if rotation == "anticlockwise":
+        p.rotateClockwise(90)
+    elif rotation == "clockwise":
+        p.rotateCounterClockwise(90)
+    return _write_page(p, page_file.name)
+
+
+class _DebugLoader(object):
+    """Regenerates the data used for plotting a table by parsing its
+    page again, for tables extracted with keep_debug=False.
+
+    It only holds the arguments of the extraction, so that it can be
+    shared by all tables of a PDF without keeping any page in memory.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath or URL of the PDF file.
+    password : str
+        Password for decryption.
+    flavor : str
+        The parsing method used ('lattice' or 'stream').
+    layout_kwargs : dict
+        A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+    kwargs : dict
+        Parser kwargs.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used if filepath
+        is a URL.
+
+    """
+
+    def __init__(
+        self, filepath, password, flavor, layout_kwargs, kwargs, download_kwargs={}
+    ):
+        self.filepath = filepath
+        self.password = password
+        self.flavor = flavor
+        self.layout_kwargs = layout_kwargs
+        self.kwargs = kwargs
+        self.download_kwargs = download_kwargs
+
+    def __call__(self, table):
+        kwargs = dict(self.kwargs, keep_debug=True)
+        with PDFHandler(
+            self.filepath,
+            pages=str(table.page),
+            password=self.password,
+            download_kwargs=self.download_kwargs,
+        ) as handler, warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            tables = handler.parse(
+                flavor=self.flavor,
+                suppress_stdout=True,
+                layout_kwargs=self.layout_kwargs,
+                **kwargs
+            )
+        for t in tables:
+            if t.order == table.order:
+                return {
+                    attr: getattr(t, attr)
+                    for attr in ["_text", "_image", "_segments", "_textedges"]
+                }
+        raise ValueError(
+            "Table {} on page-{} could not be found again".format(
+                table.order, table.page
+            )
+        )
+
+
+class _PageFailures(object):
+    """Keeps track of the pages of a PDF that failed to parse, so that
+    one bad page doesn't take down the whole run.
+
+    Failures are reported with a warning once a page of the PDF has
+    been parsed. If every page fails, the error of the first one is
+    kept for the caller to raise instead.
+
+    Parameters
+    ----------
+    suppress_stdout : bool
+        Don't report failures with a warning.
+    name : str, optional (default: None)
+        Filepath of the PDF, added to the warnings.
+
+    """
+
+    def __init__(self, suppress_stdout, name=None):
+        self.suppress_stdout = suppress_stdout
+        self.name = name
+        self.n_parsed = 0
+        self.failures = []
+
+    def failed(self, page, error):
+        self.failures.append((page, error))
+        if self.n_parsed:
+            self._warn(page, error)
+
+    def parsed(self):
+        if not self.n_parsed:
+            for page, error in self.failures:
+                self._warn(page, error)
+        self.n_parsed += 1
+
+    @property
+    def error(self):
+        """The error of the first page that failed, if no page could
+        be parsed.
+        """
+        if self.n_parsed or not self.failures:
+            return None
+        return self.failures[0][1]
+
+    def _warn(self, page, error):
+        if self.suppress_stdout:
+            return
+        where = "page-{}".format(page)
+        if self.name is not None:
+            where = "{} of {}".format(where, self.name)
+        warnings.warn("{} could not be parsed: {}".format(where, error))
+
+
+class PDFSession(object):
+    """Keeps a PDF file open for the duration of an extraction, so
+    that its cross-reference table is parsed and its contents are
+    decrypted only once.
+
+    The file is opened lazily on first use and can be reopened after
+    it has been closed.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath of the PDF file.
+    password : str, optional (default: '')
+        Password for decryption.
+
+    """
+
+    def __init__(self, filepath, password=""):
+        self.filepath = filepath
+        self.password = password
+        self._fileobj = None
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        # open file handles can't be shared with worker processes,
+        # each process opens the file again on first use
+        state = self.__dict__.copy()
+        state["_fileobj"] = None
+        state["_reader"] = None
+        return state
+
+    @property
+    def reader(self):
+        """Returns a decrypted PyPDF2 PdfFileReader for the file.
+        """
+        if self._reader is None:
+            self._fileobj = open(self.filepath, "rb")
+            try:
+                reader = PdfFileReader(self._fileobj, strict=False)
+                if reader.isEncrypted and not reader.decrypt(self.password):
+                    raise PdfReadError("file has not been decrypted")
+            except Exception:
+                self.close()
+                raise
+            self._reader = reader
+        return self._reader
+
+    @property
+    def num_pages(self):
+        return self.reader.getNumPages()
+
+    def get_page(self, page):
+        """Returns the PyPDF2 PageObject for a page number.
+        """
+        return self.reader.getPage(page - 1)
+
+    def close(self):
+        """Closes the underlying file.
+        """
+        if self._fileobj is not None:
+            self._fileobj.close()
+        self._fileobj = None
+        self._reader = None
+
+
 class PDFHandler(object):
-    """Handles all operations like temp directory creation, splitting
-    file into single page PDFs, parsing each PDF and then removing the
-    temp directory.
+    """Handles all operations like splitting file into in-memory
+    single page PDFs and parsing each PDF.
 
     Parameters
     ----------
@@ -31,14 +251,34 @@ class PDFHandler(object):
         Example: '1,3,4' or '1,4-end' or 'all'.
     password : str, optional (default: None)
         Password for decryption.
+    cache : str or camelot.cache.Cache, optional (default: None)
+        Directory, or cache, in which layouts, images, detected lines
+        and tables are kept for pages that are parsed again.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used if filepath
+        is a URL.
 
     """
 
-    def __init__(self, filepath, pages="1", password=None):
+    def __init__(
+        self, filepath, pages="1", password=None, cache=None, download_kwargs={}
+    ):
+        self.url = None
+        self.download_kwargs = download_kwargs
         if is_url(filepath):
-            filepath = download_url(filepath)
+            # the downloaded file is removed by close
+            self.url = filepath
+            filepath = download_url(filepath, **download_kwargs)
         self.filepath = filepath
-        if not filepath.lower().endswith(".pdf"):
+        self._session = None
+        try:
+            self._open(pages, password, cache)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, pages, password, cache):
+        if not self.filepath.lower().endswith(".pdf"):
             raise NotImplementedError("File format not supported")
 
         if password is None:
@@ -47,15 +287,38 @@ class PDFHandler(object):
             self.password = password
             if sys.version_info[0] < 3:
                 self.password = self.password.encode("ascii")
-        self.pages = self._get_pages(self.filepath, pages)
+        self._session = PDFSession(self.filepath, password=self.password)
+        self.pages = self._get_pages(pages)
+        if cache is not None and not isinstance(cache, Cache):
+            cache = Cache(cache)
+        self.cache = cache
+        # entries are keyed by the contents of the file, not its name
+        self._doc_key = file_hash(self.filepath) if cache is not None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the PDF file, and removes it if it was downloaded.
+        """
+        if self._session is not None:
+            self._session.close()
+        if self.url is not None and os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def _page_cache(self, page, layout_kwargs):
+        if self.cache is None:
+            return None
+        return PageCache(self.cache, self._doc_key, page, layout_kwargs)
 
-    def _get_pages(self, filepath, pages):
+    def _get_pages(self, pages):
         """Converts pages string to list of ints.
 
         Parameters
         ----------
-        filepath : str
-            Filepath or URL of the PDF file.
         pages : str, optional (default: '1')
             Comma-separated page numbers.
             Example: '1,3,4' or '1,4-end' or 'all'.
@@ -70,17 +333,14 @@ class PDFHandler(object):
         if pages == "1":
             page_numbers.append({"start": 1, "end": 1})
         else:
-            infile = PdfFileReader(open(filepath, "rb"), strict=False)
-            if infile.isEncrypted:
-                infile.decrypt(self.password)
             if pages == "all":
-                page_numbers.append({"start": 1, "end": infile.getNumPages()})
+                page_numbers.append({"start": 1, "end": self._session.num_pages})
             else:
                 for r in pages.split(","):
                     if "-" in r:
                         a, b = r.split("-")
                         if b == "end":
-                            b = infile.getNumPages()
+                            b = self._session.num_pages
                         page_numbers.append({"start": int(a), "end": int(b)})
                     else:
                         page_numbers.append({"start": int(r), "end": int(r)})
@@ -89,54 +349,277 @@ class PDFHandler(object):
             P.extend(range(p["start"], p["end"] + 1))
         return sorted(set(P))
 
-    def _save_page(self, filepath, page, temp):
-        """Saves specified page from PDF into a temporary directory.
+    def _save_page(self, page, layout_kwargs={}, cache=None, profiler=None):
+        """Saves specified page from PDF into an in-memory single page
+        PDF.
 
         Parameters
         ----------
-        filepath : str
-            Filepath or URL of the PDF file.
         page : int
             Page number.
-        temp : str
-            Tmp directory.
-
-        """
-        with open(filepath, "rb") as fileobj:
-            infile = PdfFileReader(fileobj, strict=False)
-            if infile.isEncrypted:
-                infile.decrypt(self.password)
-            fpath = os.path.join(temp, "page-{0}.pdf".format(page))
-            froot, fext = os.path.splitext(fpath)
-            p = infile.getPage(page - 1)
-            outfile = PdfFileWriter()
-            outfile.addPage(p)
-            with open(fpath, "wb") as f:
-                outfile.write(f)
-            layout, dim = get_page_layout(fpath)
-            # fix rotated PDF
-            chars = get_text_objects(layout, ltype="char")
-            horizontal_text = get_text_objects(layout, ltype="horizontal_text")
-            vertical_text = get_text_objects(layout, ltype="vertical_text")
-            rotation = get_rotation(chars, horizontal_text, vertical_text)
+        layout_kwargs : dict, optional (default: {})
+            A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+        cache : camelot.cache.PageCache, optional (default: None)
+            Cache in which the layout of the page is kept.
+        profiler : camelot.profiling.Profiler, optional (default: None)
+            Profiler with which layout analysis is timed.
+
+        Returns
+        -------
+        page_file : io.BytesIO
+            Single page PDF, named 'page-<page>.pdf'.
+        layout : object
+            PDFMiner LTPage object of the page analyzed with layout_kwargs,
+            None if the page had to be rotated or was analyzed with
+            different parameters, unless a cache is used.
+        rotation : str
+            {'', 'clockwise', 'anticlockwise'}
+            Direction in which the page was rotated.
+
+        """
+        p = self._session.get_page(page)
+        page_file = _write_page(p, "page-{0}.pdf".format(page))
+        cached = cache.get("layout") if cache is not None else None
+        if cached is not None:
+            rotation, layout = cached
             if rotation != "":
-                fpath_new = "".join([froot.replace("page", "p"), "_rotated", fext])
-                os.rename(fpath, fpath_new)
-                infile = PdfFileReader(open(fpath_new, "rb"), strict=False)
-                if infile.isEncrypted:
-                    infile.decrypt(self.password)
-                outfile = PdfFileWriter()
-                p = infile.getPage(0)
-                if rotation == "anticlockwise":
-                    p.rotateClockwise(90)
-                elif rotation == "clockwise":
-                    p.rotateCounterClockwise(90)
-                outfile.addPage(p)
-                with open(fpath, "wb") as f:
-                    outfile.write(f)
+                page_file = _rotate_page(page_file, rotation)
+            return page_file, layout, rotation
+
+        # rotation detection needs vertical text, the layout can only
+        # be handed over to the parser if it asked for it as well
+        detect_vertical = layout_kwargs.get("detect_vertical", True)
+        rotation_kwargs = dict(layout_kwargs, detect_vertical=True)
+        with stage(profiler, "layout"):
+            layout, dim = get_page_layout(page_file, **rotation_kwargs)
+        # fix rotated PDF
+        objects = flatten_layout(layout)
+        rotation = get_rotation(
+            objects["char"], objects["horizontal_text"], objects["vertical_text"]
+        )
+        if rotation != "":
+            page_file = _rotate_page(page_file, rotation)
+            layout = None
+        elif not detect_vertical:
+            layout = None
+        if cache is not None:
+            # the layout the parser needs is always cached
+            if layout is None:
+                with stage(profiler, "layout"):
+                    layout, dim = get_page_layout(page_file, **layout_kwargs)
+            cache.set("layout", (rotation, layout))
+        return page_file, layout, rotation
+
+    def _render_pages(self, pages, rasterizer, imagedir, profiler=None):
+        """Renders pages of the PDF in one go for parsers that work
+        on images.
+
+        Parameters
+        ----------
+        pages : list
+            List of int page numbers.
+        rasterizer : camelot.rasterizer.Rasterizer
+            Rasterizer used to render the pages, None if the parser
+            doesn't need images.
+        imagedir : str
+            Directory in which the images are written.
+        profiler : camelot.profiling.Profiler, optional (default: None)
+            Profiler with which rendering is timed.
+
+        Returns
+        -------
+        images : dict
+            Dict mapping page numbers to image paths.
+
+        """
+        if rasterizer is None or not pages:
+            return {}
+        with stage(profiler, "render") as counters:
+            try:
+                images = rasterizer.render(pages, imagedir)
+            except Exception:
+                # pages that weren't rendered are rendered one at a time
+                # by the parser, which reports the error for each page
+                images = {}
+            counters["pages"] = len(images)
+        return images
+
+    def _page_sizes(self, pages):
+        """Returns the sizes of pages, used to estimate the size of
+        their images.
+
+        Parameters
+        ----------
+        pages : list
+            List of int page numbers.
+
+        Returns
+        -------
+        page_sizes : dict
+            Dict mapping page numbers to tuples of the form
+            (width, height) in PDF points.
+
+        """
+        page_sizes = {}
+        for p in pages:
+            try:
+                box = self._session.get_page(p).mediaBox
+                page_sizes[p] = (float(box.getWidth()), float(box.getHeight()))
+            except Exception:
+                # the error is reported when the page is parsed
+                pass
+        return page_sizes
+
+    def _parse_batch(
+        self, pages, parser, rasterizer, suppress_stdout, layout_kwargs, profile
+    ):
+        """Renders a batch of pages in one go and parses them one after
+        another. The image of a page is removed as soon as the page has
+        been parsed.
+
+        Parameters
+        ----------
+        pages : list
+            List of int page numbers.
+        parser : camelot.parsers.Lattice or camelot.parsers.Stream
+            Parser used to extract tables from the pages.
+        rasterizer : camelot.rasterizer.Rasterizer
+            Rasterizer used to render the pages, None if the parser
+            doesn't need images.
+        suppress_stdout : bool
+            Suppress logs and warnings.
+        layout_kwargs : dict
+            A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+        profile : bool
+            Time the stages in which each page is parsed.
+
+        Returns
+        -------
+        results : list
+            List of tuples of the form (page, tables, error, profiler),
+            where error is the exception raised while parsing the page,
+            in which case tables and profiler are None.
+
+        """
+        # rendering is timed along with the first page of the batch
+        profilers = _new_profilers(pages, profile)
+        results = []
+        with TemporaryDirectory() as imagedir:
+            to_render = [
+                p for p in pages if self._needs_image(p, parser, layout_kwargs)
+            ]
+            images = self._render_pages(
+                to_render, rasterizer, imagedir, profilers[pages[0]]
+            )
+            for p in pages:
+                try:
+                    t = self._parse_page(
+                        p,
+                        parser,
+                        suppress_stdout=suppress_stdout,
+                        layout_kwargs=layout_kwargs,
+                        image=images.get(p),
+                        profiler=profilers[p],
+                    )
+                    results.append((p, t, None, profilers[p]))
+                except Exception as e:
+                    results.append((p, None, e, None))
+                finally:
+                    if p in images:
+                        os.remove(images.pop(p))
+        return results
+
+    def _parse_page(
+        self,
+        page,
+        parser,
+        suppress_stdout=False,
+        layout_kwargs={},
+        image=None,
+        profiler=None,
+    ):
+        """Extracts tables from specified page of the PDF.
+
+        Parameters
+        ----------
+        page : int
+            Page number.
+        parser : camelot.parsers.Lattice or camelot.parsers.Stream
+            Parser used to extract tables from the page.
+        suppress_stdout : bool (default: False)
+            Suppress logs and warnings.
+        layout_kwargs : dict, optional (default: {})
+            A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+        image : str, optional (default: None)
+            Path to a pre-rendered image of the page.
+        profiler : camelot.profiling.Profiler, optional (default: None)
+            Profiler with which the stages of parsing are timed.
+
+        Returns
+        -------
+        tables : list
+            List of camelot.core.Table objects found on the page.
+
+        """
+        with stage(profiler, "page") as counters:
+            tables = self._extract_page(
+                page, parser, suppress_stdout, layout_kwargs, image, profiler
+            )
+            counters["tables"] = len(tables)
+        return tables
+
+    def _extract_page(
+        self, page, parser, suppress_stdout, layout_kwargs, image, profiler
+    ):
+        cache = self._page_cache(page, layout_kwargs)
+        if cache is not None:
+            tables = cache.get("tables", parser._cache_params("tables"))
+            if tables is not None:
+                return tables
+        with stage(profiler, "save_page") as counters:
+            page_file, layout, rotation = self._save_page(
+                page, layout_kwargs=layout_kwargs, cache=cache, profiler=profiler
+            )
+            counters["rotation"] = rotation
+        kwargs = {}
+        # an image rendered from the original page doesn't match a
+        # rotated one
+        if image is not None and rotation == "":
+            kwargs["image"] = image
+        tables = parser.extract_tables(
+            page_file,
+            suppress_stdout=suppress_stdout,
+            layout_kwargs=layout_kwargs,
+            layout=layout,
+            cache=cache,
+            profiler=profiler,
+            **kwargs
+        )
+        if cache is not None:
+            cache.set("tables", tables, parser._cache_params("tables"))
+        return tables
+
+    def _needs_image(self, page, parser, layout_kwargs):
+        """Checks whether a page has to be rendered, which isn't the
+        case when the results that depend on the image are cached.
+        """
+        cache = self._page_cache(page, layout_kwargs)
+        if cache is None:
+            return True
+        return not (
+            cache.has("image", parser._cache_params("render"))
+            or cache.has("segments", parser._cache_params("segments"))
+            or cache.has("tables", parser._cache_params("tables"))
+        )
 
     def parse(
-        self, flavor="lattice", suppress_stdout=False, layout_kwargs={}, **kwargs
+        self,
+        flavor="lattice",
+        suppress_stdout=False,
+        layout_kwargs={},
+        workers=1,
+        profile=False,
+        **kwargs
     ):
         """Extracts tables by calling parser.get_tables on all single
         page PDFs.
@@ -150,6 +633,12 @@ class PDFHandler(object):
             Suppress logs and warnings.
         layout_kwargs : dict, optional (default: {})
             A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+        workers : int, optional (default: 1)
+            Number of processes used to parse pages in parallel.
+            Pages are parsed one after another when set to 1.
+        profile : bool or callable, optional (default: False)
+            Time the stages in which each page is parsed, see
+            camelot.read_pdf.
         kwargs : dict
             See camelot.read_pdf kwargs.
 
@@ -160,16 +649,512 @@ class PDFHandler(object):
 
         """
         tables = []
-        with TemporaryDirectory() as tempdir:
-            for p in self.pages:
-                self._save_page(self.filepath, p, tempdir)
-            pages = [
-                os.path.join(tempdir, "page-{0}.pdf".format(p)) for p in self.pages
-            ]
-            parser = Lattice(**kwargs) if flavor == "lattice" else Stream(**kwargs)
-            for p in pages:
-                t = parser.extract_tables(
-                    p, suppress_stdout=suppress_stdout, layout_kwargs=layout_kwargs
-                )
-                tables.extend(t)
+        for t in self.iter_parse(
+            flavor=flavor,
+            suppress_stdout=suppress_stdout,
+            layout_kwargs=layout_kwargs,
+            workers=workers,
+            profile=profile,
+            **kwargs
+        ):
+            tables.extend(t)
         return TableList(sorted(tables))
+
+    def iter_parse(
+        self,
+        flavor="lattice",
+        suppress_stdout=False,
+        layout_kwargs={},
+        workers=1,
+        profile=False,
+        **kwargs
+    ):
+        """Extracts tables page by page, pages are only split and
+        parsed as the tables are consumed. Pages that are rendered
+        together are parsed together, and their images are removed
+        before their tables are yielded.
+
+        Parameters
+        ----------
+        See parse.
+
+        Yields
+        ------
+        tables : list
+            List of camelot.core.Table objects found on a page, in
+            page order.
+
+        """
+        if workers < 1:
+            raise ValueError("workers should be greater than or equal to 1")
+
+        parser = Lattice(**kwargs) if flavor == "lattice" else Stream(**kwargs)
+        debug_loader = None
+        if not parser.keep_debug:
+            # a downloaded file is removed once parsed, it is
+            # downloaded again when needed
+            debug_loader = _DebugLoader(
+                self.url or self.filepath,
+                self.password,
+                flavor,
+                layout_kwargs,
+                kwargs,
+                download_kwargs=self.download_kwargs,
+            )
+        rasterizer = None
+        # with resolution='auto' each page is rendered by the parser, and
+        # pages are only rendered on demand when lines aren't always
+        # detected in images
+        if (
+            flavor == "lattice"
+            and parser.resolution != "auto"
+            and parser.line_source == "raster"
+        ):
+            rasterizer = Rasterizer(
+                self.filepath, password=self.password, resolution=parser.resolution
+            )
+        failures = _PageFailures(suppress_stdout)
+        with self._session:
+            # a file that can't be opened or decrypted fails as a whole
+            self._session.reader
+            if workers == 1 or len(self.pages) == 1:
+                if rasterizer is None:
+                    batches = [[p] for p in self.pages]
+                else:
+                    batches = rasterizer.batches(
+                        self.pages, page_sizes=self._page_sizes(self.pages)
+                    )
+                for batch in batches:
+                    # the batch's images are removed before its tables
+                    # are handed over
+                    results = self._parse_batch(
+                        batch,
+                        parser,
+                        rasterizer,
+                        suppress_stdout,
+                        layout_kwargs,
+                        bool(profile),
+                    )
+                    for p, t, error, profiler in results:
+                        if error is not None:
+                            failures.failed(p, error)
+                            continue
+                        failures.parsed()
+                        _set_profile(t, profiler, profile)
+                        yield _set_debug_loader(t, debug_loader)
+            else:
+                processes = min(workers, len(self.pages))
+                if rasterizer is None:
+                    batches = [[p] for p in self.pages]
+                else:
+                    # render consecutive pages together while still
+                    # spreading them over all processes
+                    batches = rasterizer.batches(
+                        self.pages,
+                        size=int(math.ceil(len(self.pages) / float(processes))),
+                        page_sizes=self._page_sizes(self.pages),
+                    )
+                # worker processes open the file themselves, make sure
+                # they don't inherit a shared file offset from this one
+                self._session.close()
+                pool = multiprocessing.Pool(
+                    processes=processes,
+                    initializer=_init_worker,
+                    initargs=(
+                        self,
+                        parser,
+                        rasterizer,
+                        suppress_stdout,
+                        layout_kwargs,
+                        bool(profile),
+                    ),
+                )
+                try:
+                    # only a few batches are in flight at any time, so that
+                    # parsed pages don't pile up when they're consumed slowly
+                    pending = collections.deque()
+                    batches = iter(batches)
+                    while True:
+                        for batch in batches:
+                            pending.append(
+                                pool.apply_async(_parse_batch_worker, (batch,))
+                            )
+                            if len(pending) >= 2 * processes:
+                                break
+                        if not pending:
+                            break
+                        for p, t, error, profiler in pending.popleft().get():
+                            if error is not None:
+                                failures.failed(p, error)
+                                continue
+                            failures.parsed()
+                            _set_profile(t, profiler, profile)
+                            yield _set_debug_loader(t, debug_loader)
+                finally:
+                    # also stops workers when the tables aren't consumed
+                    # till the end
+                    pool.terminate()
+                    pool.join()
+        if failures.error is not None:
+            raise failures.error
+
+
+class PDFBatchHandler(object):
+    """Extracts tables from many PDF files on one pool of worker
+    processes, which is started once for all files.
+
+    Pages of consecutive files are parsed at the same time, so that
+    small files keep all processes busy. Only a bounded number of
+    batches of pages is scheduled at any time, files are opened
+    as their pages are scheduled.
+
+    Parameters
+    ----------
+    filepaths : iterable
+        Filepaths or URLs of the PDF files.
+    pages : str, optional (default: '1')
+        Comma-separated page numbers, used for all files.
+        Example: '1,3,4' or '1,4-end' or 'all'.
+    password : str, optional (default: None)
+        Password for decryption, used for all files.
+    workers : int, optional (default: None)
+        Number of worker processes, the number of CPUs if not
+        specified.
+    timeout : float, optional (default: None)
+        Maximum number of seconds to wait for a file once all files
+        before it have been returned. Its worker processes are then
+        restarted, which also stops a file that hangs or crashes a
+        worker.
+    max_pending : int, optional (default: None)
+        Maximum number of batches of pages scheduled at any time,
+        twice the number of workers if not specified.
+    batch_size : int, optional (default: 16)
+        Maximum number of pages of a file parsed by one task. Pages
+        that are rendered are also batched by the estimated size of
+        their images, see camelot.rasterizer.Rasterizer.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used for files
+        given as URLs.
+
+    """
+
+    def __init__(
+        self,
+        filepaths,
+        pages="1",
+        password=None,
+        workers=None,
+        timeout=None,
+        max_pending=None,
+        batch_size=16,
+        download_kwargs={},
+    ):
+        self.filepaths = filepaths
+        self.pages = pages
+        self.password = password
+        self.workers = workers or multiprocessing.cpu_count()
+        if self.workers < 1:
+            raise ValueError("workers should be greater than or equal to 1")
+        self.timeout = timeout
+        self.max_pending = max_pending or 2 * self.workers
+        self.batch_size = batch_size
+        self.download_kwargs = download_kwargs
+
+    def _tasks(self, suppress_stdout, debug_loader_args, resolution=None):
+        """Opens files one after another and yields their batches of
+        pages, a file that can't be opened is yielded with no batch.
+        Pages rendered at resolution are batched by the estimated size
+        of their images as well.
+        """
+        for filepath in self.filepaths:
+            doc = {
+                "filepath": filepath,
+                "error": None,
+                "tables": [],
+                "handler": None,
+                "failures": _PageFailures(suppress_stdout, name=filepath),
+            }
+            try:
+                handler = PDFHandler(
+                    filepath,
+                    pages=self.pages,
+                    password=self.password,
+                    download_kwargs=self.download_kwargs,
+                )
+            except Exception as e:
+                doc.update(error=e, batches=[])
+                yield doc, None
+                continue
+            # closed, and removed if it was downloaded, once the file
+            # has been returned
+            doc["handler"] = handler
+            try:
+                # fail early on files that can't be read or decrypted,
+                # the file is opened again by the workers
+                handler._session.reader
+                page_sizes = {}
+                if resolution is not None:
+                    page_sizes = handler._page_sizes(handler.pages)
+            except Exception as e:
+                doc.update(error=e, batches=[])
+                yield doc, None
+                continue
+            finally:
+                handler._session.close()
+            pages = handler.pages
+            doc["localpath"] = handler.filepath
+            if resolution is None:
+                doc["batches"] = [
+                    pages[i : i + self.batch_size]
+                    for i in range(0, len(pages), self.batch_size)
+                ]
+            else:
+                rasterizer = Rasterizer(
+                    handler.filepath, resolution=resolution, batch_size=self.batch_size
+                )
+                doc["batches"] = rasterizer.batches(pages, page_sizes=page_sizes)
+            if debug_loader_args is not None:
+                flavor, layout_kwargs, kwargs = debug_loader_args
+                doc["debug_loader"] = _DebugLoader(
+                    handler.url or handler.filepath,
+                    handler.password,
+                    flavor,
+                    layout_kwargs,
+                    kwargs,
+                    download_kwargs=self.download_kwargs,
+                )
+            if not doc["batches"]:
+                yield doc, None
+            for batch in doc["batches"]:
+                yield doc, batch
+
+    def parse(
+        self,
+        flavor="lattice",
+        suppress_stdout=False,
+        layout_kwargs={},
+        profile=False,
+        **kwargs
+    ):
+        """Extracts tables from all files.
+
+        Parameters
+        ----------
+        flavor : str (default: 'lattice')
+            The parsing method to use ('lattice' or 'stream').
+            Lattice is used by default.
+        suppress_stdout : str (default: False)
+            Suppress logs and warnings.
+        layout_kwargs : dict, optional (default: {})
+            A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+        profile : bool or callable, optional (default: False)
+            Time the stages in which each page is parsed, see
+            camelot.read_pdf.
+        kwargs : dict
+            See camelot.read_pdf kwargs.
+
+        Yields
+        ------
+        filepath : str
+            Filepath or URL of a PDF file, in the order of filepaths.
+        tables : camelot.core.TableList or Exception
+            List of tables found in the file, or the error that stopped
+            the file from being parsed. Pages that fail to parse are
+            reported with a warning and skipped, unless every page
+            fails, in which case the error of the first one is returned.
+
+        """
+        parser = Lattice(**kwargs) if flavor == "lattice" else Stream(**kwargs)
+        render = (
+            flavor == "lattice"
+            and parser.resolution != "auto"
+            and parser.line_source == "raster"
+        )
+        initargs = (parser, render, suppress_stdout, layout_kwargs, bool(profile))
+        debug_loader_args = None
+        if not parser.keep_debug:
+            debug_loader_args = (flavor, layout_kwargs, kwargs)
+
+        # files in the order they're returned, each with its scheduled
+        # batches and their results
+        docs = collections.deque()
+        tasks = self._tasks(
+            suppress_stdout,
+            debug_loader_args,
+            resolution=parser.resolution if render else None,
+        )
+        n_pending = 0
+        pool = self._start_pool(initargs)
+        try:
+            while True:
+                while n_pending < self.max_pending:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    doc, batch = task
+                    if batch is not None and doc["error"] is not None:
+                        # the file timed out, its other batches are dropped
+                        continue
+                    if not docs or docs[-1] is not doc:
+                        doc["results"] = collections.deque()
+                        doc["n_scheduled"] = 0
+                        doc["deadline"] = None
+                        docs.append(doc)
+                    if batch is not None:
+                        doc["results"].append(self._schedule(pool, doc, batch))
+                        doc["n_scheduled"] += 1
+                        n_pending += 1
+                if not docs:
+                    break
+
+                doc = docs[0]
+                if doc["results"]:
+                    if doc["deadline"] is None and self.timeout is not None:
+                        doc["deadline"] = time.time() + self.timeout
+                    batch, result = doc["results"].popleft()
+                    n_pending -= 1
+                    try:
+                        timeout = None
+                        if doc["deadline"] is not None:
+                            timeout = max(0, doc["deadline"] - time.time())
+                        batch_results = result.get(timeout)
+                    except multiprocessing.TimeoutError:
+                        n_pending -= len(doc["results"])
+                        doc["results"].clear()
+                        doc["error"] = multiprocessing.TimeoutError(
+                            "{} could not be parsed in {} seconds".format(
+                                doc["filepath"], self.timeout
+                            )
+                        )
+                        # the workers may be stuck on this file, start
+                        # over with new ones and schedule the other
+                        # files' batches again
+                        pool.terminate()
+                        pool.join()
+                        pool = self._start_pool(initargs)
+                        for d in list(docs)[1:]:
+                            d["results"] = collections.deque(
+                                self._schedule(pool, d, b) for b, __ in d["results"]
+                            )
+                        continue
+                    for p, t, error, profiler in batch_results:
+                        if error is not None:
+                            doc["failures"].failed(p, error)
+                            continue
+                        doc["failures"].parsed()
+                        doc["tables"].extend(_set_profile(t, profiler, profile))
+                    continue
+
+                if doc["error"] is None and doc["n_scheduled"] < len(doc["batches"]):
+                    # the rest of the file's batches are yet to be scheduled
+                    continue
+                docs.popleft()
+                if doc["handler"] is not None:
+                    doc["handler"].close()
+                if doc["error"] is None:
+                    doc["error"] = doc["failures"].error
+                if doc["error"] is not None:
+                    yield doc["filepath"], doc["error"]
+                else:
+                    tables = _set_debug_loader(doc["tables"], doc.get("debug_loader"))
+                    yield doc["filepath"], TableList(sorted(tables))
+        finally:
+            pool.terminate()
+            pool.join()
+            for doc in docs:
+                if doc["handler"] is not None:
+                    doc["handler"].close()
+            tasks.close()
+
+    def _start_pool(self, initargs):
+        return multiprocessing.Pool(
+            processes=self.workers, initializer=_init_batch_worker, initargs=initargs
+        )
+
+    def _schedule(self, pool, doc, batch):
+        result = pool.apply_async(
+            _parse_file_batch_worker, (doc["localpath"], self.password, batch)
+        )
+        return batch, result
+
+
+def _set_debug_loader(tables, debug_loader):
+    for table in tables:
+        table._debug_loader = debug_loader
+    return tables
+
+
+def _new_profilers(pages, profile):
+    return {p: Profiler(page=p) if profile else None for p in pages}
+
+
+def _set_profile(tables, profiler, profile):
+    """Attaches the stages in which a page was parsed to its tables
+    and reports them to the profile callback.
+    """
+    if profiler is None:
+        return tables
+    for table in tables:
+        table._profile = profiler.records
+    if callable(profile):
+        for record in profiler.records:
+            profile(record)
+    return tables
+
+
+# state shared by all pages parsed in a worker process, so that the
+# PDF is opened and decrypted only once per process
+_worker = {}
+
+
+def _init_worker(
+    handler, parser, rasterizer, suppress_stdout, layout_kwargs, profile
+):
+    _worker["handler"] = handler
+    _worker["parser"] = parser
+    _worker["rasterizer"] = rasterizer
+    _worker["suppress_stdout"] = suppress_stdout
+    _worker["layout_kwargs"] = layout_kwargs
+    _worker["profile"] = profile
+
+
+def _parse_batch_worker(pages):
+    """Renders and parses a batch of pages inside a worker process."""
+    with warnings.catch_warnings():
+        if _worker["suppress_stdout"]:
+            warnings.simplefilter("ignore")
+        # failures are reported by the parent process
+        return _worker["handler"]._parse_batch(
+            pages,
+            _worker["parser"],
+            _worker["rasterizer"],
+            _worker["suppress_stdout"],
+            _worker["layout_kwargs"],
+            _worker["profile"],
+        )
+
+
+def _init_batch_worker(parser, render, suppress_stdout, layout_kwargs, profile):
+    _init_worker(None, parser, None, suppress_stdout, layout_kwargs, profile)
+    _worker["render"] = render
+
+
+def _parse_file_batch_worker(filepath, password, pages):
+    """Parses a batch of pages of any file inside a worker process.
+
+    The file stays open as long as the worker parses its pages.
+    """
+    handler = _worker["handler"]
+    if handler is None or handler.filepath != filepath:
+        if handler is not None:
+            handler._session.close()
+        handler = PDFHandler(filepath, password=password)
+        _worker["handler"] = handler
+        _worker["rasterizer"] = None
+        if _worker["render"]:
+            _worker["rasterizer"] = Rasterizer(
+                handler.filepath,
+                password=handler.password,
+                resolution=_worker["parser"].resolution,
+            )
+    return _parse_batch_worker(pages)
@@ -11,8 +11,9 @@ def adaptive_threshold(imagename, process_background=False, blocksize=15, c=-2):
 
     Parameters
     ----------
-    imagename : string
-        Path to image file.
+    imagename : string or object
+        Path to image file, or numpy.ndarray representing an image
+        in BGR.
     process_background : bool, optional (default: False)
         Whether or not to process lines that are in background.
     blocksize : int, optional (default: 15)
@@ -34,7 +35,10 @@ def adaptive_threshold(imagename, process_background=False, blocksize=15, c=-2):
         numpy.ndarray representing the thresholded image.
 
     """
-    img = cv2.imread(imagename)
+    if isinstance(imagename, np.ndarray):
+        img = imagename
+    else:
+        img = cv2.imread(imagename)
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
     if process_background:
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import warnings
+import itertools
 
-from .handlers import PDFHandler
-from .utils import validate_input, remove_extra
+from .handlers import PDFHandler, PDFBatchHandler
+from .utils import TemporaryDirectory, validate_input, remove_extra
 
 
 def read_pdf(
@@ -13,6 +14,10 @@ def read_pdf(
     flavor="lattice",
     suppress_stdout=False,
     layout_kwargs={},
+    workers=1,
+    cache=None,
+    download_kwargs={},
+    profile=False,
     **kwargs
 ):
     """Read PDF and return extracted tables.
@@ -36,6 +41,24 @@ def read_pdf(
         Print all logs and warnings.
     layout_kwargs : dict, optional (default: {})
         A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+    workers : int, optional (default: 1)
+        Number of processes used to parse pages in parallel. A page
+        that fails to parse is reported with a warning and skipped,
+        unless every page fails, in which case its error is raised.
+    cache : str or camelot.cache.Cache, optional (default: None)
+        Directory, or cache, in which the layout, image, detected
+        lines and tables of each page are kept. Only the stages that
+        depend on a changed parameter are recomputed when the same
+        PDF is parsed again.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used if filepath
+        is a URL. The downloaded file is removed once it is parsed.
+    profile : bool or callable, optional (default: False)
+        Record the wall time, counters and peak memory use of each
+        stage in which a page is parsed, in the 'profile' entry of the
+        parsing report of its tables. If callable, it is also called
+        with the record of each stage once its page is parsed.
+        See camelot.profiling.Profiler.
     table_areas : list, optional (default: None)
         List of table area strings of the form x1,y1,x2,y2
         where (x1, y1) -> left-top and (x2, y2) -> right-bottom
@@ -90,8 +113,19 @@ def read_pdf(
         Number of times for erosion/dilation is applied.
 
         For more information, refer `OpenCV's dilate <https://docs.opencv.org/2.4/modules/imgproc/doc/filtering.html#dilate>`_.
-    resolution* : int, optional (default: 300)
-        Resolution used for PDF to PNG conversion.
+    resolution* : int or str, optional (default: 300)
+        Resolution used for PDF to PNG conversion. If 'auto', the
+        lowest resolution at which the detected lines don't change
+        is used.
+    line_source* : str, optional (default: 'raster')
+        {'raster', 'vector', 'auto'}
+        Where lines are detected. 'raster' finds them in an image of
+        the page, 'vector' reads them from the lines and rectangles
+        drawn in the PDF, and 'auto' uses 'raster' only when no table
+        could be found using 'vector'.
+    keep_debug : bool, optional (default: False)
+        Keep the data used for plotting with each table. If False, it
+        is regenerated from the PDF when a table is plotted.
 
     Returns
     -------
@@ -108,12 +142,310 @@ def read_pdf(
             warnings.simplefilter("ignore")
 
         validate_input(kwargs, flavor=flavor)
-        p = PDFHandler(filepath, pages=pages, password=password)
         kwargs = remove_extra(kwargs, flavor=flavor)
-        tables = p.parse(
-            flavor=flavor,
-            suppress_stdout=suppress_stdout,
-            layout_kwargs=layout_kwargs,
-            **kwargs
-        )
+        with PDFHandler(
+            filepath,
+            pages=pages,
+            password=password,
+            cache=cache,
+            download_kwargs=download_kwargs,
+        ) as p:
+            tables = p.parse(
+                flavor=flavor,
+                suppress_stdout=suppress_stdout,
+                layout_kwargs=layout_kwargs,
+                workers=workers,
+                profile=profile,
+                **kwargs
+            )
         return tables
+
+
+def iter_pdf(
+    filepath,
+    pages="1",
+    password=None,
+    flavor="lattice",
+    suppress_stdout=False,
+    layout_kwargs={},
+    workers=1,
+    cache=None,
+    download_kwargs={},
+    profile=False,
+    **kwargs
+):
+    """Read PDF and yield extracted tables as soon as the page they
+    are on is parsed.
+
+    Pages are split and parsed only as the tables are consumed, so
+    memory use doesn't grow with the number of pages in the PDF. The
+    PDF is opened, and downloaded if it is a URL, when the first table
+    is asked for.
+
+    Parameters
+    ----------
+    See read_pdf.
+
+    Yields
+    ------
+    table : camelot.core.Table
+        Tables in page order.
+
+    """
+    if flavor not in ["lattice", "stream"]:
+        raise NotImplementedError(
+            "Unknown flavor specified." " Use either 'lattice' or 'stream'"
+        )
+
+    with warnings.catch_warnings():
+        if suppress_stdout:
+            warnings.simplefilter("ignore")
+
+        validate_input(kwargs, flavor=flavor)
+        # checked before any table is asked for
+        if workers < 1:
+            raise ValueError("workers should be greater than or equal to 1")
+        kwargs = remove_extra(kwargs, flavor=flavor)
+    handler_kwargs = dict(
+        pages=pages, password=password, cache=cache, download_kwargs=download_kwargs
+    )
+    parse_kwargs = dict(
+        kwargs,
+        flavor=flavor,
+        suppress_stdout=suppress_stdout,
+        layout_kwargs=layout_kwargs,
+        workers=workers,
+        profile=profile,
+    )
+    return _iter_tables(
+        filepath, handler_kwargs, parse_kwargs, suppress_stdout=suppress_stdout
+    )
+
+
+def _iter_tables(filepath, handler_kwargs, parse_kwargs, suppress_stdout=False):
+    # the PDF is opened, and downloaded if it is a URL, only once the
+    # first table is asked for, so that nothing is left on disk when
+    # the tables are never consumed
+    with warnings.catch_warnings():
+        if suppress_stdout:
+            warnings.simplefilter("ignore")
+        handler = PDFHandler(filepath, **handler_kwargs)
+    try:
+        page_tables = handler.iter_parse(**parse_kwargs)
+        try:
+            while True:
+                # warnings are only filtered while a page is being parsed,
+                # not while the caller holds on to a table
+                with warnings.catch_warnings():
+                    if suppress_stdout:
+                        warnings.simplefilter("ignore")
+                    try:
+                        tables = next(page_tables)
+                    except StopIteration:
+                        return
+                for table in tables:
+                    yield table
+        finally:
+            # also when the tables aren't consumed till the end
+            page_tables.close()
+    finally:
+        handler.close()
+
+
+def sweep(
+    filepath,
+    grid,
+    pages="1",
+    password=None,
+    flavor="lattice",
+    suppress_stdout=False,
+    layout_kwargs={},
+    workers=1,
+    cache=None,
+    download_kwargs={},
+    **kwargs
+):
+    """Read PDF with every combination of the given parameter values
+    and report how well tables were extracted with each one.
+
+    The layout and the rendered image of each page are computed only
+    once, and every stage that doesn't depend on a swept parameter is
+    reused across combinations.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath or URL of the PDF file.
+    grid : dict
+        Dict mapping kwargs of read_pdf to the list of values that
+        should be tried for them.
+        Example: {'line_scale': [15, 40], 'iterations': [0, 1]}.
+    pages : str, optional (default: '1')
+        Comma-separated page numbers.
+        Example: '1,3,4' or '1,4-end' or 'all'.
+    password : str, optional (default: None)
+        Password for decryption.
+    flavor : str (default: 'lattice')
+        The parsing method to use ('lattice' or 'stream').
+        Lattice is used by default.
+    suppress_stdout : bool, optional (default: True)
+        Print all logs and warnings.
+    layout_kwargs : dict, optional (default: {})
+        A dict of `pdfminer.layout.LAParams <https://github.com/euske/pdfminer/blob/master/pdfminer/layout.py#L33>`_ kwargs.
+    workers : int, optional (default: 1)
+        Number of processes used to parse pages in parallel.
+    cache : str or camelot.cache.Cache, optional (default: None)
+        Directory, or cache, in which intermediate results are kept.
+        A temporary directory is used if not specified.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used if filepath
+        is a URL.
+    kwargs : dict
+        See read_pdf kwargs, used for all combinations.
+
+    Returns
+    -------
+    results : list
+        List of dicts, one for each combination in the order of
+        itertools.product over the sorted grid keys, with the keys
+        'params', 'n_tables', 'accuracy' and 'whitespace'. Accuracy
+        and whitespace are averaged over the tables found, they are
+        None if no table was found. 'reports' holds the parsing report
+        of each table.
+
+    """
+    if flavor not in ["lattice", "stream"]:
+        raise NotImplementedError(
+            "Unknown flavor specified." " Use either 'lattice' or 'stream'"
+        )
+    keys = sorted(grid)
+    validate_input(dict(kwargs, **dict.fromkeys(keys)), flavor=flavor)
+
+    with TemporaryDirectory() as tempdir, PDFHandler(
+        filepath,
+        pages=pages,
+        password=password,
+        cache=tempdir if cache is None else cache,
+        download_kwargs=download_kwargs,
+    ) as p:
+        results = []
+        for values in itertools.product(*[grid[k] for k in keys]):
+            params = dict(zip(keys, values))
+            with warnings.catch_warnings():
+                if suppress_stdout:
+                    warnings.simplefilter("ignore")
+                tables = p.parse(
+                    flavor=flavor,
+                    suppress_stdout=suppress_stdout,
+                    layout_kwargs=layout_kwargs,
+                    workers=workers,
+                    **dict(kwargs, **params)
+                )
+            reports = [t.parsing_report for t in tables]
+            results.append(
+                {
+                    "params": params,
+                    "n_tables": len(tables),
+                    "accuracy": _mean([r["accuracy"] for r in reports]),
+                    "whitespace": _mean([r["whitespace"] for r in reports]),
+                    "reports": reports,
+                }
+            )
+    return results
+
+
+def _mean(values):
+    return sum(values) / float(len(values)) if values else None
+
+
+def read_pdfs(
+    filepaths,
+    pages="1",
+    password=None,
+    flavor="lattice",
+    suppress_stdout=False,
+    layout_kwargs={},
+    workers=None,
+    timeout=None,
+    max_pending=None,
+    download_kwargs={},
+    profile=False,
+    **kwargs
+):
+    """Read many PDFs on one pool of worker processes and yield the
+    tables extracted from each of them.
+
+    Pages of different PDFs are parsed at the same time, and the
+    worker processes are started only once, which saves their start-up
+    cost when parsing a lot of small PDFs.
+
+    Parameters
+    ----------
+    filepaths : iterable
+        Filepaths or URLs of the PDF files, which can be a generator.
+    workers : int, optional (default: None)
+        Number of worker processes, the number of CPUs if not
+        specified.
+    timeout : float, optional (default: None)
+        Maximum number of seconds to wait for a PDF once all PDFs
+        before it have been returned. A PDF that takes longer is
+        reported with a multiprocessing.TimeoutError.
+    max_pending : int, optional (default: None)
+        Maximum number of batches of pages scheduled at any time,
+        twice the number of workers if not specified. PDFs are only
+        opened as their pages are scheduled.
+    download_kwargs : dict, optional (default: {})
+        A dict of camelot.utils.download_url kwargs, used for PDFs
+        given as URLs. A downloaded PDF is removed once it has been
+        returned.
+
+    See read_pdf for the other parameters, which are used for all
+    PDFs.
+
+    Yields
+    ------
+    filepath : str
+        Filepath or URL of a PDF file, in the order of filepaths.
+    tables : camelot.core.TableList or Exception
+        Tables extracted from the PDF, or the error that stopped it
+        from being parsed. Pages that fail to parse are reported with
+        a warning and skipped, unless every page fails, in which case
+        the error of the first one is returned.
+
+    """
+    if flavor not in ["lattice", "stream"]:
+        raise NotImplementedError(
+            "Unknown flavor specified." " Use either 'lattice' or 'stream'"
+        )
+
+    validate_input(kwargs, flavor=flavor)
+    kwargs = remove_extra(kwargs, flavor=flavor)
+    p = PDFBatchHandler(
+        filepaths,
+        pages=pages,
+        password=password,
+        workers=workers,
+        timeout=timeout,
+        max_pending=max_pending,
+        download_kwargs=download_kwargs,
+    )
+    results = p.parse(
+        flavor=flavor,
+        suppress_stdout=suppress_stdout,
+        layout_kwargs=layout_kwargs,
+        profile=profile,
+        **kwargs
+    )
+    return _iter_results(results, suppress_stdout=suppress_stdout)
+
+
+def _iter_results(results, suppress_stdout=False):
+    while True:
+        with warnings.catch_warnings():
+            if suppress_stdout:
+                warnings.simplefilter("ignore")
+            try:
+                result = next(results)
+            except StopIteration:
+                return
+        yield result
@@ -2,19 +2,62 @@
 
 import os
 
-from ..utils import get_page_layout, get_text_objects
+from ..profiling import stage
+from ..utils import get_page_layout, flatten_layout, TextIndex
 
 
 class BaseParser(object):
     """Defines a base parser.
     """
 
-    def _generate_layout(self, filename, layout_kwargs):
+    # attributes that the result of each cached stage depends on, on
+    # top of the stages before it
+    _cache_attrs = {}
+
+    # set by extract_tables to time the stages of a page
+    _profiler = None
+
+    def _stage(self, name):
+        return stage(self._profiler, name)
+
+    def _cache_params(self, layer):
+        """Returns the parameters that a cached stage depends on.
+        """
+        params = {"parser": self.__class__.__name__}
+        for l in ["image", "segments", "tables"]:
+            params.update(
+                (attr, getattr(self, attr)) for attr in self._cache_attrs.get(l, [])
+            )
+            if l == layer:
+                break
+        return params
+
+    def _generate_layout(self, filename, layout_kwargs, layout=None):
         self.filename = filename
         self.layout_kwargs = layout_kwargs
-        self.layout, self.dimensions = get_page_layout(filename, **layout_kwargs)
-        self.images = get_text_objects(self.layout, ltype="image")
-        self.horizontal_text = get_text_objects(self.layout, ltype="horizontal_text")
-        self.vertical_text = get_text_objects(self.layout, ltype="vertical_text")
+        if layout is None:
+            with self._stage("layout"):
+                self.layout, self.dimensions = get_page_layout(
+                    filename, **layout_kwargs
+                )
+        else:
+            # reuse a layout the caller already analyzed with layout_kwargs
+            self.layout = layout
+            self.dimensions = (layout.bbox[2], layout.bbox[3])
+        with self._stage("flatten_layout") as counters:
+            # walked once, text lines are kept as TextLine records
+            objects = flatten_layout(self.layout)
+            self.images = objects["image"]
+            self.curves = objects["curve"]
+            self.horizontal_text = objects["horizontal_text"]
+            self.vertical_text = objects["vertical_text"]
+            # built once per page, tables and regions are looked up in it
+            self._text_index = {
+                "horizontal": TextIndex(self.horizontal_text),
+                "vertical": TextIndex(self.vertical_text),
+            }
+            counters["horizontal_text"] = len(self.horizontal_text)
+            counters["vertical_text"] = len(self.vertical_text)
         self.pdf_width, self.pdf_height = self.dimensions
-        self.rootname, __ = os.path.splitext(self.filename)
+        # in-memory pages are named like the files they stand in for
+        self.rootname, __ = os.path.splitext(getattr(filename, "name", filename))
@@ -4,6 +4,7 @@ from __future__ import division
 import os
 import sys
 import copy
+import shutil
 import locale
 import logging
 import warnings
@@ -15,12 +16,15 @@ import pandas as pd
 from .base import BaseParser
 from ..core import Table
 from ..utils import (
+    TemporaryDirectory,
     scale_image,
     scale_pdf,
-    segments_in_bbox,
-    text_in_bbox,
+    SegmentIndex,
+    get_curve_segments,
+    merge_segments,
+    find_vector_joints,
     merge_close_lines,
-    get_table_index,
+    get_table_indices,
     compute_accuracy,
     compute_whitespace,
 )
@@ -34,6 +38,28 @@ from ..image_processing import (
 
 logger = logging.getLogger("camelot")
 
+# resolutions tried in order when resolution='auto'
+AUTO_RESOLUTIONS = [100, 150, 200, 300]
+
+# attributes set by Lattice._generate_table_bbox
+_LINE_ATTRS = [
+    "imagename",
+    "image",
+    "threshold",
+    "table_bbox_unscaled",
+    "table_bbox",
+    "vertical_segments",
+    "horizontal_segments",
+]
+
+# attributes kept in the segments layer of the cache
+_SEGMENT_ATTRS = [
+    "table_bbox_unscaled",
+    "table_bbox",
+    "vertical_segments",
+    "horizontal_segments",
+]
+
 
 class Lattice(BaseParser):
     """Lattice method of parsing looks for lines between text
@@ -90,11 +116,59 @@ class Lattice(BaseParser):
         Number of times for erosion/dilation is applied.
 
         For more information, refer `OpenCV's dilate <https://docs.opencv.org/2.4/modules/imgproc/doc/filtering.html#dilate>`_.
-    resolution : int, optional (default: 300)
-        Resolution used for PDF to PNG conversion.
+    resolution : int or str, optional (default: 300)
+        Resolution used for PDF to PNG conversion. If 'auto', the
+        lowest resolution at which the detected lines don't change
+        is used.
+    line_source : str, optional (default: 'raster')
+        {'raster', 'vector', 'auto'}
+        Where lines are detected. 'raster' finds them in an image of
+        the page, 'vector' reads them from the lines and rectangles
+        drawn in the PDF, and 'auto' uses 'raster' only when no table
+        could be found using 'vector'.
+    keep_debug : bool, optional (default: False)
+        Keep the data used for plotting with each table. If False, it
+        is regenerated from the PDF when a table is plotted.
 
     """
 
+    _cache_attrs = {
+        "image": [
+            "resolution",
+            "process_background",
+            "threshold_blocksize",
+            "threshold_constant",
+        ],
+        "segments": [
+            "line_source",
+            "line_scale",
+            "iterations",
+            "line_tol",
+            "joint_tol",
+            "table_areas",
+            "table_regions",
+        ],
+        "tables": [
+            "copy_text",
+            "shift_text",
+            "split_text",
+            "flag_size",
+            "strip_text",
+            "keep_debug",
+        ],
+    }
+
+    def _cache_params(self, layer):
+        if layer == "render":
+            # the rendered page is kept in the image layer next to its
+            # thresholded version, it only depends on the resolution
+            # unless that is chosen by looking at the detected lines
+            params = self._cache_params("image")
+            if self.resolution != "auto":
+                params = {"parser": params["parser"], "resolution": self.resolution}
+            return dict(params, rendered=True)
+        return super(Lattice, self)._cache_params(layer)
+
     def __init__(
         self,
         table_regions=None,
@@ -112,6 +186,8 @@ class Lattice(BaseParser):
         threshold_constant=-2,
         iterations=0,
         resolution=300,
+        line_source="raster",
+        keep_debug=False,
         **kwargs
     ):
         self.table_regions = table_regions
@@ -129,6 +205,12 @@ class Lattice(BaseParser):
         self.threshold_constant = threshold_constant
         self.iterations = iterations
         self.resolution = resolution
+        if line_source not in ["raster", "vector", "auto"]:
+            raise ValueError(
+                "Specify line_source as either 'raster', 'vector' or 'auto'"
+            )
+        self.line_source = line_source
+        self.keep_debug = keep_debug
 
     @staticmethod
     def _reduce_index(t, idx, shift_text):
@@ -153,24 +235,25 @@ class Lattice(BaseParser):
             r_idx and c_idx are new row and column indices for text.
 
         """
+        grid = t._grid
         indices = []
         for r_idx, c_idx, text in idx:
             for d in shift_text:
                 if d == "l":
-                    if t.cells[r_idx][c_idx].hspan:
-                        while not t.cells[r_idx][c_idx].left:
+                    if grid["hspan"][r_idx, c_idx]:
+                        while not grid["left"][r_idx, c_idx]:
                             c_idx -= 1
                 if d == "r":
-                    if t.cells[r_idx][c_idx].hspan:
-                        while not t.cells[r_idx][c_idx].right:
+                    if grid["hspan"][r_idx, c_idx]:
+                        while not grid["right"][r_idx, c_idx]:
                             c_idx += 1
                 if d == "t":
-                    if t.cells[r_idx][c_idx].vspan:
-                        while not t.cells[r_idx][c_idx].top:
+                    if grid["vspan"][r_idx, c_idx]:
+                        while not grid["top"][r_idx, c_idx]:
                             r_idx -= 1
                 if d == "b":
-                    if t.cells[r_idx][c_idx].vspan:
-                        while not t.cells[r_idx][c_idx].bottom:
+                    if grid["vspan"][r_idx, c_idx]:
+                        while not grid["bottom"][r_idx, c_idx]:
                             r_idx += 1
             indices.append((r_idx, c_idx, text))
         return indices
@@ -193,35 +276,69 @@ class Lattice(BaseParser):
         t : camelot.core.Table
 
         """
+        grid = t._grid
+        text = grid["text"]
         for f in copy_text:
             if f == "h":
-                for i in range(len(t.cells)):
-                    for j in range(len(t.cells[i])):
-                        if t.cells[i][j].text.strip() == "":
-                            if t.cells[i][j].hspan and not t.cells[i][j].left:
-                                t.cells[i][j].text = t.cells[i][j - 1].text
+                # spanning cells that need text are found in one go, text
+                # is copied in order so that it flows across several cells
+                for i, j in zip(*np.nonzero(grid["hspan"] & ~grid["left"])):
+                    if text[i, j].strip() == "":
+                        text[i, j] += text[i, j - 1]
             elif f == "v":
-                for i in range(len(t.cells)):
-                    for j in range(len(t.cells[i])):
-                        if t.cells[i][j].text.strip() == "":
-                            if t.cells[i][j].vspan and not t.cells[i][j].top:
-                                t.cells[i][j].text = t.cells[i - 1][j].text
+                for i, j in zip(*np.nonzero(grid["vspan"] & ~grid["top"])):
+                    if text[i, j].strip() == "":
+                        text[i, j] += text[i - 1, j]
         return t
 
-    def _generate_image(self):
+    def _generate_image(self, resolution=None):
         from ..ext.ghostscript import Ghostscript
 
-        self.imagename = "".join([self.rootname, ".png"])
-        gs_call = "-q -sDEVICE=png16m -o {} -r300 {}".format(
-            self.imagename, self.filename
+        if resolution is None:
+            resolution = self.resolution
+
+        filename = self.filename
+        if hasattr(filename, "read"):
+            # in-memory pages are written next to the image, like
+            # batches of pages are rendered from a file
+            filename = os.path.join(
+                os.path.dirname(self.imagename),
+                "{}.pdf".format(os.path.basename(self.rootname)),
+            )
+            if not os.path.exists(filename):
+                self.filename.seek(0)
+                with open(filename, "wb") as f:
+                    shutil.copyfileobj(self.filename, f)
+        gs_call = "-q -sDEVICE=png16m -o {} -r{} {}".format(
+            self.imagename, resolution, filename
         )
         gs_call = gs_call.encode().split()
-        null = open(os.devnull, "wb")
-        with Ghostscript(*gs_call, stdout=null) as gs:
-            pass
-        null.close()
+        with self._stage("render") as counters:
+            with open(os.devnull, "wb") as null:
+                with Ghostscript(*gs_call, stdout=null):
+                    pass
+            counters["resolution"] = resolution
+
+    def _generate_table_bbox(self, image=None):
+        with self._stage("threshold"):
+            self.image, self.threshold = adaptive_threshold(
+                self.imagename if image is None else image,
+                process_background=self.process_background,
+                blocksize=self.threshold_blocksize,
+                c=self.threshold_constant,
+            )
+        self._find_lines(self._find_table_bbox)
 
-    def _generate_table_bbox(self):
+    def _find_lines(self, find):
+        """Runs a line detection method as the find_lines stage.
+        """
+        with self._stage("find_lines") as counters:
+            find()
+            counters["vertical_segments"] = len(self.vertical_segments)
+            counters["horizontal_segments"] = len(self.horizontal_segments)
+            counters["tables"] = len(self.table_bbox)
+
+    def _find_table_bbox(self):
         def scale_areas(areas):
             scaled_areas = []
             for area in areas:
@@ -234,13 +351,6 @@ class Lattice(BaseParser):
                 scaled_areas.append((x1, y1, abs(x2 - x1), abs(y2 - y1)))
             return scaled_areas
 
-        self.image, self.threshold = adaptive_threshold(
-            self.imagename,
-            process_background=self.process_background,
-            blocksize=self.threshold_blocksize,
-            c=self.threshold_constant,
-        )
-
         image_width = self.image.shape[1]
         image_height = self.image.shape[0]
         image_width_scaler = image_width / float(self.pdf_width)
@@ -295,14 +405,138 @@ class Lattice(BaseParser):
             table_bbox, vertical_segments, horizontal_segments, pdf_scalers
         )
 
+    def _generate_table_bbox_vector(self):
+        def parse_areas(areas):
+            parsed_areas = []
+            for area in areas:
+                x1, y1, x2, y2 = area.split(",")
+                x1 = float(x1)
+                y1 = float(y1)
+                x2 = float(x2)
+                y2 = float(y2)
+                parsed_areas.append((x1, y2, x2, y1))
+            return parsed_areas
+
+        regions = None
+        if self.table_areas is None and self.table_regions is not None:
+            regions = parse_areas(self.table_regions)
+        vertical_segments, horizontal_segments = get_curve_segments(
+            self.curves, regions=regions, line_tol=self.line_tol
+        )
+        # drop lines shorter than the ones find_lines would pick up
+        vertical_segments = [
+            v
+            for v in merge_segments(
+                vertical_segments, "vertical", line_tol=self.line_tol
+            )
+            if v[3] - v[1] >= self.pdf_height / self.line_scale
+        ]
+        horizontal_segments = [
+            h
+            for h in merge_segments(
+                horizontal_segments, "horizontal", line_tol=self.line_tol
+            )
+            if h[2] - h[0] >= self.pdf_width / self.line_scale
+        ]
+
+        areas = None
+        if self.table_areas is not None:
+            areas = parse_areas(self.table_areas)
+        table_bbox = find_vector_joints(
+            areas, vertical_segments, horizontal_segments, joint_tol=self.joint_tol
+        )
+
+        # there's no page image, joints are plotted in PDF coordinate space
+        self.image = None
+        self.threshold = None
+        self.table_bbox_unscaled = copy.deepcopy(table_bbox)
+        self.table_bbox = table_bbox
+        self.vertical_segments = vertical_segments
+        self.horizontal_segments = horizontal_segments
+
+    def _same_lines(self, a, b):
+        """Checks whether lines detected at two resolutions are the
+        same, up to line_tol in PDF coordinate space.
+        """
+
+        def close(x, y):
+            return len(x) == len(y) and np.allclose(
+                sorted(x), sorted(y), rtol=0, atol=self.line_tol
+            )
+
+        return (
+            close(a["vertical_segments"], b["vertical_segments"])
+            and close(a["horizontal_segments"], b["horizontal_segments"])
+            and close(list(a["table_bbox"].keys()), list(b["table_bbox"].keys()))
+            and sorted(len(j) for j in a["table_bbox"].values())
+            == sorted(len(j) for j in b["table_bbox"].values())
+        )
+
+    def _generate_table_bbox_auto(self, tempdir):
+        """Renders the page at increasing resolutions and keeps the
+        lowest one at which the detected lines stop changing.
+        """
+        previous = None
+        for resolution in AUTO_RESOLUTIONS:
+            self.imagename = os.path.join(
+                tempdir,
+                "{}-{}.png".format(os.path.basename(self.rootname), resolution),
+            )
+            self._generate_image(resolution=resolution)
+            self._generate_table_bbox()
+            current = {attr: getattr(self, attr) for attr in _LINE_ATTRS}
+            if previous is not None and self._same_lines(previous, current):
+                for attr in _LINE_ATTRS:
+                    setattr(self, attr, previous[attr])
+                break
+            previous = current
+
+    def _generate_lines(self, image=None, cache=None):
+        """Detects lines, in the PDF or in an image of the page
+        depending on line_source.
+        """
+        if self.line_source in ["vector", "auto"]:
+            self._find_lines(self._generate_table_bbox_vector)
+        if self.line_source == "raster" or (
+            self.line_source == "auto" and not self.table_bbox
+        ):
+            rendered = threshold = None
+            if cache is not None:
+                rendered = cache.get("image", self._cache_params("render"))
+            if rendered is not None:
+                self.imagename = None
+                threshold = cache.get("image", self._cache_params("image"))
+                if threshold is not None:
+                    self.image, self.threshold = rendered, threshold
+                    self._find_lines(self._find_table_bbox)
+                else:
+                    self._generate_table_bbox(image=rendered)
+            else:
+                with TemporaryDirectory() as tempdir:
+                    if image is not None:
+                        # the page was already rendered along with its
+                        # neighbours
+                        self.imagename = image
+                        self._generate_table_bbox()
+                    elif self.resolution == "auto":
+                        self._generate_table_bbox_auto(tempdir)
+                    else:
+                        self.imagename = os.path.join(
+                            tempdir, "{}.png".format(os.path.basename(self.rootname))
+                        )
+                        self._generate_image()
+                        self._generate_table_bbox()
+                if cache is not None:
+                    cache.set("image", self.image, self._cache_params("render"))
+            if cache is not None and threshold is None:
+                cache.set("image", self.threshold, self._cache_params("image"))
+
     def _generate_columns_and_rows(self, table_idx, tk):
         # select elements which lie within table_bbox
         t_bbox = {}
-        v_s, h_s = segments_in_bbox(
-            tk, self.vertical_segments, self.horizontal_segments
-        )
-        t_bbox["horizontal"] = text_in_bbox(tk, self.horizontal_text)
-        t_bbox["vertical"] = text_in_bbox(tk, self.vertical_text)
+        v_s, h_s = self._segment_index.in_bbox(tk)
+        t_bbox["horizontal"] = self._text_index["horizontal"].in_bbox(tk)
+        t_bbox["vertical"] = self._text_index["vertical"].in_bbox(tk)
 
         t_bbox["horizontal"].sort(key=lambda x: (-x.y0, x.x0))
         t_bbox["vertical"].sort(key=lambda x: (x.x0, -x.y0))
@@ -329,33 +563,37 @@ class Lattice(BaseParser):
             raise ValueError("No segments found on {}".format(self.rootname))
 
         table = Table(cols, rows)
-        # set table edges to True using ver+hor lines
-        table = table.set_edges(v_s, h_s, joint_tol=self.joint_tol)
-        # set table border edges to True
-        table = table.set_border()
-        # set spanning cells to True
-        table = table.set_span()
+        with self._stage("set_edges") as counters:
+            # set table edges to True using ver+hor lines
+            table = table.set_edges(v_s, h_s, joint_tol=self.joint_tol)
+            # set table border edges to True
+            table = table.set_border()
+            # set spanning cells to True
+            table = table.set_span()
+            counters["cells"] = len(rows) * len(cols)
 
         pos_errors = []
         # TODO: have a single list in place of two directional ones?
         # sorted on x-coordinate based on reading order i.e. LTR or RTL
-        for direction in ["vertical", "horizontal"]:
-            for t in self.t_bbox[direction]:
-                indices, error = get_table_index(
+        with self._stage("get_table_index") as counters:
+            for direction in ["vertical", "horizontal"]:
+                all_indices, errors = get_table_indices(
                     table,
-                    t,
+                    self.t_bbox[direction],
                     direction,
                     split_text=self.split_text,
                     flag_size=self.flag_size,
                     strip_text=self.strip_text,
                 )
-                if indices[:2] != (-1, -1):
-                    pos_errors.append(error)
-                    indices = Lattice._reduce_index(
-                        table, indices, shift_text=self.shift_text
-                    )
-                    for r_idx, c_idx, text in indices:
-                        table.cells[r_idx][c_idx].text = text
+                for indices, error in zip(all_indices, errors.tolist()):
+                    if indices[:2] != (-1, -1):
+                        pos_errors.append(error)
+                        indices = Lattice._reduce_index(
+                            table, indices, shift_text=self.shift_text
+                        )
+                        for r_idx, c_idx, text in indices:
+                            table._grid["text"][r_idx, c_idx] += text
+                counters[direction + "_text"] = len(self.t_bbox[direction])
         accuracy = compute_accuracy([[100, pos_errors]])
 
         if self.copy_text is not None:
@@ -373,18 +611,29 @@ class Lattice(BaseParser):
         table.page = int(os.path.basename(self.rootname).replace("page-", ""))
 
         # for plotting
-        _text = []
-        _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.horizontal_text])
-        _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.vertical_text])
-        table._text = _text
-        table._image = (self.image, self.table_bbox_unscaled)
-        table._segments = (self.vertical_segments, self.horizontal_segments)
-        table._textedges = None
+        if self.keep_debug:
+            _text = []
+            _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.horizontal_text])
+            _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.vertical_text])
+            table._text = _text
+            table._image = (self.image, self.table_bbox_unscaled)
+            table._segments = (self.vertical_segments, self.horizontal_segments)
+            table._textedges = None
 
         return table
 
-    def extract_tables(self, filename, suppress_stdout=False, layout_kwargs={}):
-        self._generate_layout(filename, layout_kwargs)
+    def extract_tables(
+        self,
+        filename,
+        suppress_stdout=False,
+        layout_kwargs={},
+        layout=None,
+        image=None,
+        cache=None,
+        profiler=None,
+    ):
+        self._profiler = profiler
+        self._generate_layout(filename, layout_kwargs, layout=layout)
         if not suppress_stdout:
             logger.info("Processing {}".format(os.path.basename(self.rootname)))
 
@@ -400,16 +649,35 @@ class Lattice(BaseParser):
                 )
             return []
 
-        self._generate_image()
-        self._generate_table_bbox()
+        lines = None
+        if cache is not None:
+            lines = cache.get("segments", self._cache_params("segments"))
+        if lines is not None:
+            self.imagename = self.image = self.threshold = None
+            for attr in _SEGMENT_ATTRS:
+                setattr(self, attr, lines[attr])
+            if self.keep_debug:
+                # the image is only needed for plotting
+                self.image = cache.get("image", self._cache_params("render"))
+        else:
+            self._generate_lines(image=image, cache=cache)
+            if cache is not None:
+                lines = {attr: getattr(self, attr) for attr in _SEGMENT_ATTRS}
+                cache.set("segments", lines, self._cache_params("segments"))
+
+        self._segment_index = SegmentIndex(
+            self.vertical_segments, self.horizontal_segments
+        )
 
         _tables = []
         # sort tables based on y-coord
         for table_idx, tk in enumerate(
             sorted(self.table_bbox.keys(), key=lambda x: x[1], reverse=True)
         ):
-            cols, rows, v_s, h_s = self._generate_columns_and_rows(table_idx, tk)
-            table = self._generate_table(table_idx, cols, rows, v_s=v_s, h_s=h_s)
+            with self._stage("generate_table") as counters:
+                cols, rows, v_s, h_s = self._generate_columns_and_rows(table_idx, tk)
+                table = self._generate_table(table_idx, cols, rows, v_s=v_s, h_s=h_s)
+                counters["shape"] = table.shape
             table._bbox = tk
             _tables.append(table)
 
@@ -10,12 +10,58 @@ import pandas as pd
 
 from .base import BaseParser
 from ..core import TextEdges, Table
-from ..utils import text_in_bbox, get_table_index, compute_accuracy, compute_whitespace
+from ..utils import TextIndex, get_table_indices, compute_accuracy, compute_whitespace
 
 
 logger = logging.getLogger("camelot")
 
 
+def _text_coords(text):
+    """Returns the coordinates of PDFMiner text objects as an array
+    of (x0, y0, x1, y1) rows.
+    """
+    coords = [(t.x0, t.y0, t.x1, t.y1) for t in text]
+    return np.array(coords, dtype=float).reshape(-1, 4)
+
+
+def _row_ids(y0, filled, row_tol):
+    """Numbers rows of text, a row starts at text whose y0 isn't
+    close to the y0 of the text that started the previous row.
+
+    Text is numbered from 1, text before the first row starts is
+    numbered 0, and text that is blank -1.
+    """
+    row_ids = np.full(len(y0), -1, dtype=int)
+    row = 0
+    row_y = 0
+    for i, y in enumerate(y0):
+        if filled[i]:
+            # same as np.isclose(row_y, y, atol=row_tol)
+            if not abs(row_y - y) <= row_tol + 1e-05 * abs(y):
+                row += 1
+                row_y = y
+            row_ids[i] = row
+    return row_ids
+
+
+def _merge_overlapping_columns(l, column_tol):
+    # with a negative tolerance, overlapping boundaries are kept apart
+    # if they're close
+    merged = []
+    for higher in l:
+        if not merged:
+            merged.append(higher)
+            continue
+        lower = merged[-1]
+        if higher[0] <= lower[1] and not np.isclose(
+            higher[0], lower[1], atol=abs(column_tol)
+        ):
+            merged[-1] = (min(lower[0], higher[0]), max(lower[1], higher[1]))
+        else:
+            merged.append(higher)
+    return merged
+
+
 class Stream(BaseParser):
     """Stream method of parsing looks for spaces between text
     to parse the table.
@@ -52,9 +98,27 @@ class Stream(BaseParser):
     column_tol : int, optional (default: 0)
         Tolerance parameter used to combine text horizontally,
         to generate columns.
+    keep_debug : bool, optional (default: False)
+        Keep the data used for plotting with each table. If False, it
+        is regenerated from the PDF when a table is plotted.
 
     """
 
+    _cache_attrs = {
+        "tables": [
+            "table_regions",
+            "table_areas",
+            "columns",
+            "split_text",
+            "flag_size",
+            "strip_text",
+            "edge_tol",
+            "row_tol",
+            "column_tol",
+            "keep_debug",
+        ]
+    }
+
     def __init__(
         self,
         table_regions=None,
@@ -66,6 +130,7 @@ class Stream(BaseParser):
         edge_tol=50,
         row_tol=2,
         column_tol=0,
+        keep_debug=False,
         **kwargs
     ):
         self.table_regions = table_regions
@@ -78,6 +143,7 @@ class Stream(BaseParser):
         self.edge_tol = edge_tol
         self.row_tol = row_tol
         self.column_tol = column_tol
+        self.keep_debug = keep_debug
 
     @staticmethod
     def _text_bbox(t_bbox):
@@ -119,22 +185,19 @@ class Stream(BaseParser):
             Two-dimensional list of text objects grouped into rows.
 
         """
-        row_y = 0
-        rows = []
-        temp = []
-        for t in text:
-            # is checking for upright necessary?
-            # if t.get_text().strip() and all([obj.upright for obj in t._objs if
-            # type(obj) is LTChar]):
-            if t.get_text().strip():
-                if not np.isclose(row_y, t.y0, atol=row_tol):
-                    rows.append(sorted(temp, key=lambda t: t.x0))
-                    temp = []
-                    row_y = t.y0
-                temp.append(t)
-        rows.append(sorted(temp, key=lambda t: t.x0))
-        __ = rows.pop(0)  # TODO: hacky
-        return rows
+        # is checking for upright necessary?
+        # if t.get_text().strip() and all([obj.upright for obj in t._objs if
+        # type(obj) is LTChar]):
+        filled = [bool(t.get_text().strip()) for t in text]
+        coords = _text_coords(text)
+        row_ids = _row_ids(coords[:, 1].tolist(), filled, row_tol)
+        # the group of text close to y=0 is dropped, TODO: hacky
+        keep = np.flatnonzero(row_ids > 0)
+        # text is sorted by row and then by x0, keeping its order
+        # within rows where x0 is the same
+        keep = keep[np.lexsort((coords[keep, 0], row_ids[keep]))]
+        splits = np.flatnonzero(np.diff(row_ids[keep])) + 1
+        return [[text[i] for i in row] for row in np.split(keep, splits) if len(row)]
 
     @staticmethod
     def _merge_columns(l, column_tol=0):
@@ -153,32 +216,20 @@ class Stream(BaseParser):
             List of merged column x-coordinate tuples.
 
         """
-        merged = []
-        for higher in l:
-            if not merged:
-                merged.append(higher)
-            else:
-                lower = merged[-1]
-                if column_tol >= 0:
-                    if higher[0] <= lower[1] or np.isclose(
-                        higher[0], lower[1], atol=column_tol
-                    ):
-                        upper_bound = max(lower[1], higher[1])
-                        lower_bound = min(lower[0], higher[0])
-                        merged[-1] = (lower_bound, upper_bound)
-                    else:
-                        merged.append(higher)
-                elif column_tol < 0:
-                    if higher[0] <= lower[1]:
-                        if np.isclose(higher[0], lower[1], atol=abs(column_tol)):
-                            merged.append(higher)
-                        else:
-                            upper_bound = max(lower[1], higher[1])
-                            lower_bound = min(lower[0], higher[0])
-                            merged[-1] = (lower_bound, upper_bound)
-                    else:
-                        merged.append(higher)
-        return merged
+        if not l:
+            return []
+        if column_tol < 0:
+            return _merge_overlapping_columns(l, column_tol)
+        x = np.array(l, dtype=float)
+        # as boundaries are sorted and end after they start, the end
+        # of the column that a boundary could be merged into is the
+        # largest end so far
+        ends = np.maximum.accumulate(x[:, 1])
+        starts = x[1:, 0]
+        new = (starts > ends[:-1]) & ~np.isclose(starts, ends[:-1], atol=column_tol)
+        first = np.concatenate(([0], np.flatnonzero(new) + 1))
+        last = np.append(first[1:], len(l)) - 1
+        return list(zip(x[first, 0].tolist(), ends[last].tolist()))
 
     @staticmethod
     def _join_rows(rows_grouped, text_y_max, text_y_min):
@@ -197,11 +248,16 @@ class Stream(BaseParser):
             List of continuous row y-coordinate tuples.
 
         """
-        row_mids = [
-            sum([(t.y0 + t.y1) / 2 for t in r]) / len(r) if len(r) > 0 else 0
-            for r in rows_grouped
-        ]
-        rows = [(row_mids[i] + row_mids[i - 1]) / 2 for i in range(1, len(row_mids))]
+        sizes = np.array([len(r) for r in rows_grouped], dtype=int)
+        coords = _text_coords([t for r in rows_grouped for t in r])
+        # summed in the order of each row's text
+        sums = np.bincount(
+            np.repeat(np.arange(len(sizes)), sizes),
+            weights=(coords[:, 1] + coords[:, 3]) / 2,
+            minlength=len(sizes),
+        )
+        row_mids = np.where(sizes > 0, sums / np.maximum(sizes, 1), 0)
+        rows = ((row_mids[1:] + row_mids[:-1]) / 2).tolist()
         rows.insert(0, text_y_max)
         rows.append(text_y_min)
         rows = [(rows[i], rows[i + 1]) for i in range(0, len(rows) - 1)]
@@ -252,8 +308,8 @@ class Stream(BaseParser):
             Updated list of column x-coordinate tuples.
 
         """
-        cols = sorted(cols)
-        cols = [(cols[i][0] + cols[i - 1][1]) / 2 for i in range(1, len(cols))]
+        cols = np.array(sorted(cols), dtype=float).reshape(-1, 2)
+        cols = ((cols[1:, 0] + cols[:-1, 1]) / 2).tolist()
         cols.insert(0, text_x_min)
         cols.append(text_x_max)
         cols = [(cols[i], cols[i + 1]) for i in range(0, len(cols) - 1)]
@@ -274,15 +330,19 @@ class Stream(BaseParser):
         """
         # TODO: add support for arabic text #141
         # sort textlines in reading order
-        textlines.sort(key=lambda x: (-x.y0, x.x0))
-        textedges = TextEdges(edge_tol=self.edge_tol)
-        # generate left, middle and right textedges
-        textedges.generate(textlines)
-        # select relevant edges
-        relevant_textedges = textedges.get_relevant()
-        self.textedges.extend(relevant_textedges)
-        # guess table areas using textlines and relevant edges
-        table_bbox = textedges.get_table_areas(textlines, relevant_textedges)
+        with self._stage("detect_tables") as counters:
+            textlines.sort(key=lambda x: (-x.y0, x.x0))
+            textedges = TextEdges(edge_tol=self.edge_tol)
+            # generate left, middle and right textedges
+            textedges.generate(textlines)
+            # select relevant edges
+            relevant_textedges = textedges.get_relevant()
+            self.textedges.extend(relevant_textedges)
+            # guess table areas using textlines and relevant edges
+            table_bbox = textedges.get_table_areas(textlines, relevant_textedges)
+            counters["textlines"] = len(textlines)
+            counters["textedges"] = len(relevant_textedges)
+            counters["tables"] = len(table_bbox)
         # treat whole page as table area if no table areas found
         if not len(table_bbox):
             table_bbox = {(0, 0, self.pdf_width, self.pdf_height): None}
@@ -302,10 +362,16 @@ class Stream(BaseParser):
                     y1 = float(y1)
                     x2 = float(x2)
                     y2 = float(y2)
-                    region_text = text_in_bbox((x1, y2, x2, y1), self.horizontal_text)
+                    region_text = self._text_index["horizontal"].in_bbox(
+                        (x1, y2, x2, y1)
+                    )
                     hor_text.extend(region_text)
             # find tables based on nurminen's detection algorithm
             table_bbox = self._nurminen_table_detection(hor_text)
+            if hor_text is self.horizontal_text:
+                # detection sorts the text in place, which changes the
+                # order in which lookups return it
+                self._text_index["horizontal"] = TextIndex(self.horizontal_text)
         else:
             table_bbox = {}
             for area in self.table_areas:
@@ -320,8 +386,8 @@ class Stream(BaseParser):
     def _generate_columns_and_rows(self, table_idx, tk):
         # select elements which lie within table_bbox
         t_bbox = {}
-        t_bbox["horizontal"] = text_in_bbox(tk, self.horizontal_text)
-        t_bbox["vertical"] = text_in_bbox(tk, self.vertical_text)
+        t_bbox["horizontal"] = self._text_index["horizontal"].in_bbox(tk)
+        t_bbox["vertical"] = self._text_index["vertical"].in_bbox(tk)
 
         t_bbox["horizontal"].sort(key=lambda x: (-x.y0, x.x0))
         t_bbox["vertical"].sort(key=lambda x: (x.x0, -x.y0))
@@ -362,25 +428,17 @@ class Stream(BaseParser):
                     )
             cols = [(t.x0, t.x1) for r in rows_grouped if len(r) == ncols for t in r]
             cols = self._merge_columns(sorted(cols), column_tol=self.column_tol)
-            inner_text = []
-            for i in range(1, len(cols)):
-                left = cols[i - 1][1]
-                right = cols[i][0]
-                inner_text.extend(
-                    [
-                        t
-                        for direction in self.t_bbox
-                        for t in self.t_bbox[direction]
-                        if t.x0 > left and t.x1 < right
-                    ]
-                )
-            outer_text = [
-                t
-                for direction in self.t_bbox
-                for t in self.t_bbox[direction]
-                if t.x0 > cols[-1][1] or t.x1 < cols[0][0]
+            text = [t for direction in self.t_bbox for t in self.t_bbox[direction]]
+            x = _text_coords(text)[:, [0, 2]]
+            # text in the gaps between columns, gap by gap, followed by
+            # text on either side of them
+            inner = [
+                np.flatnonzero((x[:, 0] > cols[i - 1][1]) & (x[:, 1] < cols[i][0]))
+                for i in range(1, len(cols))
             ]
-            inner_text.extend(outer_text)
+            outer = (x[:, 0] > cols[-1][1]) | (x[:, 1] < cols[0][0])
+            inner.append(np.flatnonzero(outer))
+            inner_text = [text[i] for i in np.concatenate(inner).tolist()]
             cols = self._add_columns(cols, inner_text, self.row_tol)
             cols = self._join_columns(cols, text_x_min, text_x_max)
 
@@ -393,20 +451,22 @@ class Stream(BaseParser):
         pos_errors = []
         # TODO: have a single list in place of two directional ones?
         # sorted on x-coordinate based on reading order i.e. LTR or RTL
-        for direction in ["vertical", "horizontal"]:
-            for t in self.t_bbox[direction]:
-                indices, error = get_table_index(
+        with self._stage("get_table_index") as counters:
+            for direction in ["vertical", "horizontal"]:
+                all_indices, errors = get_table_indices(
                     table,
-                    t,
+                    self.t_bbox[direction],
                     direction,
                     split_text=self.split_text,
                     flag_size=self.flag_size,
                     strip_text=self.strip_text,
                 )
-                if indices[:2] != (-1, -1):
-                    pos_errors.append(error)
-                    for r_idx, c_idx, text in indices:
-                        table.cells[r_idx][c_idx].text = text
+                for indices, error in zip(all_indices, errors.tolist()):
+                    if indices[:2] != (-1, -1):
+                        pos_errors.append(error)
+                        for r_idx, c_idx, text in indices:
+                            table._grid["text"][r_idx, c_idx] += text
+                counters[direction + "_text"] = len(self.t_bbox[direction])
         accuracy = compute_accuracy([[100, pos_errors]])
 
         data = table.data
@@ -421,18 +481,30 @@ class Stream(BaseParser):
         table.page = int(os.path.basename(self.rootname).replace("page-", ""))
 
         # for plotting
-        _text = []
-        _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.horizontal_text])
-        _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.vertical_text])
-        table._text = _text
-        table._image = None
-        table._segments = None
-        table._textedges = self.textedges
+        if self.keep_debug:
+            _text = []
+            _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.horizontal_text])
+            _text.extend([(t.x0, t.y0, t.x1, t.y1) for t in self.vertical_text])
+            table._text = _text
+            table._image = None
+            table._segments = None
+            table._textedges = self.textedges
 
         return table
 
-    def extract_tables(self, filename, suppress_stdout=False, layout_kwargs={}):
-        self._generate_layout(filename, layout_kwargs)
+    def extract_tables(
+        self,
+        filename,
+        suppress_stdout=False,
+        layout_kwargs={},
+        layout=None,
+        cache=None,
+        profiler=None,
+    ):
+        # text is the only input of stream, there are no intermediate
+        # results worth caching besides the layout
+        self._profiler = profiler
+        self._generate_layout(filename, layout_kwargs, layout=layout)
         if not suppress_stdout:
             logger.info("Processing {}".format(os.path.basename(self.rootname)))
 
@@ -455,8 +527,10 @@ class Stream(BaseParser):
         for table_idx, tk in enumerate(
             sorted(self.table_bbox.keys(), key=lambda x: x[1], reverse=True)
         ):
-            cols, rows = self._generate_columns_and_rows(table_idx, tk)
-            table = self._generate_table(table_idx, cols, rows)
+            with self._stage("generate_table") as counters:
+                cols, rows = self._generate_columns_and_rows(table_idx, tk)
+                table = self._generate_table(table_idx, cols, rows)
+                counters["shape"] = table.shape
             table._bbox = tk
             _tables.append(table)
 
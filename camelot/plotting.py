@@ -43,7 +43,7 @@ class PlotMethods(object):
             )
 
         plot_method = getattr(self, kind)
-        return plot_method(table)
+        return plot_method(table._load_debug())
 
     def text(self, table):
         """Generates a plot for all text elements present
@@ -142,7 +142,11 @@ class PlotMethods(object):
                 ax.set_ylim(min(ys) - 10, max(ys) + 10)
 
         if _FOR_LATTICE:
-            ax.imshow(img)
+            if img is not None:
+                ax.imshow(img)
+            else:
+                # lines were read from the PDF, there's no page image
+                ax.autoscale_view()
         return fig
 
     def textedge(self, table):
@@ -197,7 +201,8 @@ class PlotMethods(object):
                 x_coord.append(coord[0])
                 y_coord.append(coord[1])
         ax.plot(x_coord, y_coord, "ro")
-        ax.imshow(img)
+        if img is not None:
+            ax.imshow(img)
         return fig
 
     def line(self, table):
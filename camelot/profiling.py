@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import contextlib
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+
+if sys.version_info[0] >= 3:
+    _timer = time.perf_counter
+else:
+    _timer = time.time
+
+
+def max_rss():
+    """Returns the memory high-water mark of the current process.
+
+    Returns
+    -------
+    max_rss : int
+        Peak resident set size in bytes, None where it can't be
+        measured.
+
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in kilobytes, except on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _reset_peak_rss():
+    """Resets the memory high-water mark of the current process to its
+    resident set size, which is only possible on Linux.
+
+    Returns
+    -------
+    reset : bool
+        Whether the high-water mark could be reset.
+
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _peak_rss():
+    """Returns the memory high-water mark of the current process since
+    it was last reset, in bytes, None where it can't be read.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class Profiler(object):
+    """Records the wall time, counters and peak memory use of the
+    stages in which a page is parsed.
+
+    Each stage is recorded as a dict with the keys 'stage', 'page',
+    'time' (in seconds), 'peak_rss' (in bytes) and 'counters', in the
+    order in which the stages end. The time and peak memory use of a
+    stage include those of the stages nested in it.
+
+    The peak resident set size of a stage is measured by resetting the
+    memory high-water mark of the process when the stage starts, which
+    is only possible on Linux. It is None on other platforms.
+
+    Parameters
+    ----------
+    page : int, optional (default: None)
+        Page number the stages are recorded for.
+
+    """
+
+    def __init__(self, page=None):
+        self.page = page
+        self.records = []
+        # peak memory use so far of the stages that are running,
+        # innermost last
+        self._peaks = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the stage run inside the with block, which gets a
+        dict in which counters of the stage can be set.
+        """
+        counters = {}
+        if self._peaks:
+            # the high-water mark is about to be reset, what it reached
+            # so far counts for the enclosing stage
+            self._peaks[-1] = _max(self._peaks[-1], _peak_rss())
+        reset = _reset_peak_rss()
+        self._peaks.append(None)
+        start = _timer()
+        try:
+            yield counters
+        finally:
+            elapsed = _timer() - start
+            peak = self._peaks.pop()
+            if reset:
+                peak = _max(peak, _peak_rss())
+            if self._peaks:
+                self._peaks[-1] = _max(self._peaks[-1], peak)
+            self.records.append(
+                {
+                    "stage": name,
+                    "page": self.page,
+                    "time": elapsed,
+                    "peak_rss": peak,
+                    "counters": counters,
+                }
+            )
+
+
+@contextlib.contextmanager
+def _null_stage():
+    yield {}
+
+
+def stage(profiler, name):
+    """Returns a context manager that times a stage with profiler,
+    or does nothing if profiler is None.
+
+    Parameters
+    ----------
+    profiler : camelot.profiling.Profiler
+    name : str
+        Name of the stage.
+
+    """
+    if profiler is None:
+        return _null_stage()
+    return profiler.stage(name)
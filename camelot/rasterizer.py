@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+
+def _get_runs(pages):
+    """Splits sorted page numbers into runs of consecutive pages.
+
+    Parameters
+    ----------
+    pages : list
+        Sorted list of int page numbers.
+
+    Returns
+    -------
+    runs : list
+        List of tuples of the form (first, last).
+
+    """
+    runs = []
+    for p in pages:
+        if runs and runs[-1][1] == p - 1:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+    return runs
+
+
+# size of an A4 page in PDF points, assumed for pages whose size isn't
+# known
+A4 = (595, 842)
+
+
+def image_bytes(page_size, resolution):
+    """Estimates the size of the uncompressed image of a page.
+
+    Parameters
+    ----------
+    page_size : tuple
+        Tuple of the form (width, height) in PDF points.
+    resolution : int
+        Resolution used for rendering, in dpi.
+
+    Returns
+    -------
+    size : int
+        Size of the image in bytes, with 3 bytes per pixel.
+
+    """
+    width, height = page_size
+    return int(width * resolution / 72.0) * int(height * resolution / 72.0) * 3
+
+
+class Rasterizer(object):
+    """Renders pages of a PDF file to PNG images using Ghostscript.
+
+    Consecutive pages are rendered by a single interpreter call, which
+    saves the interpreter start-up cost that dominates rendering time
+    on small pages.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath of the PDF file.
+    password : str, optional (default: '')
+        Password for decryption.
+    resolution : int, optional (default: 300)
+        Resolution used for rendering, in dpi.
+    batch_size : int, optional (default: 16)
+        Maximum number of pages rendered by a single call.
+    max_bytes : int, optional (default: 134217728)
+        Maximum estimated size of the uncompressed images of a batch,
+        which bounds the disk space and memory used by a batch at any
+        time. A page whose image is larger gets a batch of its own.
+
+    """
+
+    def __init__(
+        self,
+        filepath,
+        password="",
+        resolution=300,
+        batch_size=16,
+        max_bytes=128 * 2 ** 20,
+    ):
+        self.filepath = filepath
+        self.password = password
+        self.resolution = resolution
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+
+    def batches(self, pages, size=None, page_sizes={}):
+        """Splits page numbers into batches that are rendered together.
+
+        Parameters
+        ----------
+        pages : list
+            Sorted list of int page numbers.
+        size : int, optional (default: None)
+            Maximum number of pages in a batch, batch_size is used if
+            not specified.
+        page_sizes : dict, optional (default: {})
+            Dict mapping page numbers to tuples of the form
+            (width, height) in PDF points, used to estimate the size of
+            their images. Pages that aren't in it are assumed to be A4.
+
+        Returns
+        -------
+        batches : list
+            List of lists of int page numbers.
+
+        """
+        size = min(size or self.batch_size, self.batch_size)
+        batches = []
+        n_bytes = 0
+        for p in pages:
+            p_bytes = image_bytes(page_sizes.get(p, A4), self.resolution)
+            if (
+                not batches
+                or len(batches[-1]) >= size
+                or n_bytes + p_bytes > self.max_bytes
+            ):
+                batches.append([])
+                n_bytes = 0
+            batches[-1].append(p)
+            n_bytes += p_bytes
+        return batches
+
+    def _render_run(self, first, last, imagedir):
+        from .ext.ghostscript import Ghostscript
+
+        template = os.path.join(imagedir, "page-{}-%d.png".format(first))
+        gs_call = [
+            "-q",
+            "-sDEVICE=png16m",
+            "-o",
+            template,
+            "-r{}".format(self.resolution),
+            "-dFirstPage={}".format(first),
+            "-dLastPage={}".format(last),
+        ]
+        if self.password:
+            gs_call.append("-sPDFPassword={}".format(self.password))
+        gs_call.append(self.filepath)
+        gs_call = [a if isinstance(a, bytes) else a.encode() for a in gs_call]
+        with open(os.devnull, "wb") as null:
+            with Ghostscript(*gs_call, stdout=null):
+                pass
+
+        # ghostscript numbers output pages starting from 1 on every call
+        images = {}
+        for p in range(first, last + 1):
+            imagename = template.replace("%d", str(p - first + 1))
+            if os.path.exists(imagename):
+                images[p] = imagename
+        return images
+
+    def render(self, pages, imagedir):
+        """Renders pages to PNG images.
+
+        Parameters
+        ----------
+        pages : list
+            Sorted list of int page numbers.
+        imagedir : str
+            Directory in which the images are written.
+
+        Returns
+        -------
+        images : dict
+            Dict mapping page numbers to image paths.
+
+        """
+        images = {}
+        for first, last in _get_runs(pages):
+            images.update(self._render_run(first, last, imagedir))
+        return images
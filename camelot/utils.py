@@ -9,6 +9,7 @@ import shutil
 import string
 import tempfile
 import warnings
+from bisect import bisect_left, bisect_right
 from itertools import groupby
 from operator import itemgetter
 
@@ -27,6 +28,8 @@ from pdfminer.layout import (
     LTTextLineHorizontal,
     LTTextLineVertical,
     LTImage,
+    LTCurve,
+    LTRect,
 )
 
 
@@ -75,31 +78,61 @@ def random_string(length):
     return ret
 
 
-def download_url(url):
+def download_url(url, buffer_size=64 * 1024, max_size=None):
     """Download file from specified URL.
 
+    The content type is checked before the body is read, and the body
+    is written to disk as it is received.
+
     Parameters
     ----------
     url : str or unicode
+    buffer_size : int, optional (default: 65536)
+        Number of bytes read from the response and written to disk at
+        a time.
+    max_size : int, optional (default: None)
+        Maximum size of the file in bytes, a larger file isn't
+        downloaded.
 
     Returns
     -------
     filepath : str or unicode
-        Temporary filepath.
+        Temporary filepath, it is up to the caller to remove it.
 
     """
-    filename = "{}.pdf".format(random_string(6))
-    with tempfile.NamedTemporaryFile("wb", delete=False) as f:
-        obj = urlopen(url)
+    obj = urlopen(url)
+    try:
         if PY3:
             content_type = obj.info().get_content_type()
+            content_length = obj.info().get("Content-Length")
         else:
             content_type = obj.info().getheader("Content-Type")
+            content_length = obj.info().getheader("Content-Length")
         if content_type != "application/pdf":
             raise NotImplementedError("File format not supported")
-        f.write(obj.read())
-    filepath = os.path.join(os.path.dirname(f.name), filename)
-    shutil.move(f.name, filepath)
+        size_error = "File is larger than max_size of {} bytes".format(max_size)
+        if max_size is not None and content_length is not None:
+            if int(content_length) > max_size:
+                raise ValueError(size_error)
+
+        fd, filepath = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                size = 0
+                while True:
+                    chunk = obj.read(buffer_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    # the announced length can't be trusted
+                    if max_size is not None and size > max_size:
+                        raise ValueError(size_error)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(filepath)
+            raise
+    finally:
+        obj.close()
     return filepath
 
 
@@ -115,6 +148,7 @@ lattice_kwargs = [
     "threshold_constant",
     "iterations",
     "resolution",
+    "line_source",
 ]
 
 
@@ -259,7 +293,7 @@ def scale_image(tables, v_segments, h_segments, factors):
         j_x, j_y = zip(*tables[k])
         j_x = [scale(j, scaling_factor_x) for j in j_x]
         j_y = [scale(abs(translate(-img_y, j)), scaling_factor_y) for j in j_y]
-        joints = zip(j_x, j_y)
+        joints = list(zip(j_x, j_y))
         tables_new[(x1, y1, x2, y2)] = joints
 
     v_segments_new = []
@@ -379,6 +413,124 @@ def text_in_bbox(bbox, text):
     return t_bbox
 
 
+class _SortedIndex(object):
+    """Sorts objects on a key to look up the ones whose key lies in a
+    range using binary search.
+
+    Parameters
+    ----------
+    objs : list
+    key : function
+        Function that returns the key of an object.
+
+    """
+
+    def __init__(self, objs, key):
+        self._order = sorted(range(len(objs)), key=lambda i: key(objs[i]))
+        self._keys = [key(objs[i]) for i in self._order]
+
+    def range(self, lo, hi):
+        """Returns the positions of objects with lo <= key <= hi, in the
+        order the objects were passed in.
+        """
+        i = bisect_left(self._keys, lo)
+        j = bisect_right(self._keys, hi)
+        return sorted(self._order[i:j])
+
+
+class TextIndex(object):
+    """Spatial index of text objects on a page, which answers the
+    same queries as text_in_bbox without scanning all text objects.
+
+    Parameters
+    ----------
+    text : list
+        List of PDFMiner text objects.
+
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._x = [(t.x0 + t.x1) / 2.0 for t in text]
+        self._index = _SortedIndex(text, key=lambda t: (t.y0 + t.y1) / 2.0)
+
+    def in_bbox(self, bbox):
+        """Returns all text objects present inside a bounding box.
+
+        Parameters
+        ----------
+        bbox : tuple
+            Tuple (x1, y1, x2, y2) representing a bounding box where
+            (x1, y1) -> lb and (x2, y2) -> rt in the PDF coordinate
+            space.
+
+        Returns
+        -------
+        t_bbox : list
+            List of PDFMiner text objects that lie inside table.
+
+        """
+        lb = (bbox[0], bbox[1])
+        rt = (bbox[2], bbox[3])
+        return [
+            self.text[i]
+            for i in self._index.range(lb[1] - 2, rt[1] + 2)
+            if lb[0] - 2 <= self._x[i] <= rt[0] + 2
+        ]
+
+
+class SegmentIndex(object):
+    """Spatial index of line segments on a page, which answers the
+    same queries as segments_in_bbox without scanning all segments.
+
+    Parameters
+    ----------
+    v_segments : list
+        List of vertical line segments.
+    h_segments : list
+        List of horizontal line segments.
+
+    """
+
+    def __init__(self, v_segments, h_segments):
+        self.v_segments = v_segments
+        self.h_segments = h_segments
+        self._v_index = _SortedIndex(v_segments, key=itemgetter(0))
+        self._h_index = _SortedIndex(h_segments, key=itemgetter(1))
+
+    def in_bbox(self, bbox):
+        """Returns all line segments present inside a bounding box.
+
+        Parameters
+        ----------
+        bbox : tuple
+            Tuple (x1, y1, x2, y2) representing a bounding box where
+            (x1, y1) -> lb and (x2, y2) -> rt in PDFMiner coordinate
+            space.
+
+        Returns
+        -------
+        v_s : list
+            List of vertical line segments that lie inside table.
+        h_s : list
+            List of horizontal line segments that lie inside table.
+
+        """
+        lb = (bbox[0], bbox[1])
+        rt = (bbox[2], bbox[3])
+        v_s = [
+            self.v_segments[i]
+            for i in self._v_index.range(lb[0] - 2, rt[0] + 2)
+            if self.v_segments[i][1] > lb[1] - 2 and self.v_segments[i][3] < rt[1] + 2
+        ]
+        h_s = [
+            self.h_segments[i]
+            for i in self._h_index.range(lb[1] - 2, rt[1] + 2)
+            if self.h_segments[i][0] > lb[0] - 2 and self.h_segments[i][2] < rt[0] + 2
+        ]
+        return v_s, h_s
+
+
 def merge_close_lines(ar, line_tol=2):
     """Merges lines which are within a tolerance by calculating a
     moving mean, based on their x or y axis projections.
@@ -407,6 +559,295 @@ def merge_close_lines(ar, line_tol=2):
     return ret
 
 
+def _is_white(color):
+    """Checks whether a PDFMiner color is white in the gray, RGB or
+    CMYK color space.
+    """
+    if color is None:
+        return False
+    if isinstance(color, (int, float)):
+        color = [color]
+    color = list(color)
+    if len(color) == 4:
+        return all(c == 0 for c in color)
+    return all(c == 1 for c in color)
+
+
+def _get_rectangles(pts):
+    """Splits the points of a PDFMiner curve into rectangles, if the
+    curve was drawn as a series of them.
+
+    PDFMiner joins all subpaths of a path into a single curve, so a
+    path made of 're' operators has to be split back into rectangles
+    to avoid treating the jumps between them as lines.
+
+    Parameters
+    ----------
+    pts : list
+        List of points of the form (x, y).
+
+    Returns
+    -------
+    rects : list
+        List of tuples of the form (x1, y1, x2, y2) where
+        (x1, y1) -> lb and (x2, y2) -> rt, None if the points don't
+        form rectangles.
+
+    """
+    if not pts or len(pts) % 4 != 0:
+        return None
+    rects = []
+    for i in range(0, len(pts), 4):
+        (ax, ay), (bx, by), (cx, cy), (dx, dy) = pts[i : i + 4]
+        if not (
+            (ay == by and bx == cx and cy == dy and dx == ax)
+            or (ax == bx and by == cy and cx == dx and dy == ay)
+        ):
+            return None
+        rects.append((min(ax, cx), min(ay, cy), max(ax, cx), max(ay, cy)))
+    return rects
+
+
+def _is_disjoint_lines(pts, line_tol=2):
+    """Checks whether the points of a PDFMiner curve come from a path
+    of separate straight lines, each drawn with a moveto and a lineto.
+
+    That's assumed when all pairs of points are horizontal or vertical
+    lines and at least one jump between them isn't.
+    """
+
+    def is_straight(a, b):
+        return abs(a[0] - b[0]) <= line_tol or abs(a[1] - b[1]) <= line_tol
+
+    if len(pts) < 4 or len(pts) % 2 != 0:
+        return False
+    if not all(is_straight(a, b) for a, b in zip(pts[::2], pts[1::2])):
+        return False
+    return not all(is_straight(a, b) for a, b in zip(pts[1::2], pts[2::2]))
+
+
+def get_curve_segments(curves, regions=None, line_tol=2):
+    """Breaks PDFMiner curve objects down into vertical and horizontal
+    line segments.
+
+    Parameters
+    ----------
+    curves : list
+        List of PDFMiner LTCurve objects.
+    regions : list, optional (default: None)
+        List of page regions of the form (x1, y1, x2, y2) where
+        (x1, y1) -> lb and (x2, y2) -> rt in PDFMiner coordinate
+        space. Segments are clipped to these regions.
+    line_tol : int, optional (default: 2)
+        Rectangles thinner than this are treated as a single line, and
+        curve pieces that stray less than this from an axis are
+        treated as straight.
+
+    Returns
+    -------
+    v_segments : list
+        List of vertical line segments of the form (x, y1, x, y2)
+        where y1 < y2.
+    h_segments : list
+        List of horizontal line segments of the form (x1, y, x2, y)
+        where x1 < x2.
+
+    """
+    v_segments = []
+    h_segments = []
+    for c in curves:
+        if not getattr(c, "stroke", True) and _is_white(
+            getattr(c, "non_stroking_color", None)
+        ):
+            # white fills don't draw anything on a white page
+            continue
+        if isinstance(c, LTRect):
+            rects = [c.bbox]
+        else:
+            rects = _get_rectangles(c.pts)
+        if rects is not None:
+            for x0, y0, x1, y1 in rects:
+                if x1 - x0 <= line_tol or y1 - y0 <= line_tol:
+                    # thin rectangles are commonly used to draw rules
+                    if x1 - x0 < y1 - y0:
+                        x = (x0 + x1) / 2.0
+                        v_segments.append((x, y0, x, y1))
+                    else:
+                        y = (y0 + y1) / 2.0
+                        h_segments.append((x0, y, x1, y))
+                else:
+                    v_segments.extend([(x0, y0, x0, y1), (x1, y0, x1, y1)])
+                    h_segments.extend([(x0, y0, x1, y0), (x0, y1, x1, y1)])
+            continue
+        pts = c.pts
+        if _is_disjoint_lines(pts, line_tol):
+            lines = zip(pts[::2], pts[1::2])
+        else:
+            lines = zip(pts, pts[1:])
+        for (ax, ay), (bx, by) in lines:
+            dx, dy = abs(ax - bx), abs(ay - by)
+            if dx <= line_tol and dy > dx:
+                x = (ax + bx) / 2.0
+                v_segments.append((x, min(ay, by), x, max(ay, by)))
+            elif dy <= line_tol and dx > dy:
+                y = (ay + by) / 2.0
+                h_segments.append((min(ax, bx), y, max(ax, bx), y))
+
+    if regions is not None:
+        v_clipped = []
+        h_clipped = []
+        for rx1, ry1, rx2, ry2 in regions:
+            for x, sy1, __, sy2 in v_segments:
+                if rx1 <= x <= rx2 and max(sy1, ry1) < min(sy2, ry2):
+                    v_clipped.append((x, max(sy1, ry1), x, min(sy2, ry2)))
+            for sx1, y, sx2, __ in h_segments:
+                if ry1 <= y <= ry2 and max(sx1, rx1) < min(sx2, rx2):
+                    h_clipped.append((max(sx1, rx1), y, min(sx2, rx2), y))
+        v_segments, h_segments = v_clipped, h_clipped
+    return v_segments, h_segments
+
+
+def merge_segments(segments, direction, line_tol=2):
+    """Merges collinear line segments which overlap or are within a
+    tolerance of each other.
+
+    Parameters
+    ----------
+    segments : list
+        List of vertical line segments of the form (x, y1, x, y2) or
+        horizontal line segments of the form (x1, y, x2, y).
+    direction : string
+        Specifies whether the segments are 'vertical' or 'horizontal'.
+    line_tol : int, optional (default: 2)
+
+    Returns
+    -------
+    merged : list
+        List of merged line segments in the same form.
+
+    """
+    if direction == "vertical":
+        lines = [(s[0], s[1], s[3]) for s in segments]
+    elif direction == "horizontal":
+        lines = [(s[1], s[0], s[2]) for s in segments]
+    else:
+        raise ValueError("Specify direction as either 'vertical' or 'horizontal'")
+
+    # group segments lying on (almost) the same line
+    groups = []
+    for line in sorted(lines):
+        if groups and line[0] - groups[-1][-1][0] <= line_tol:
+            groups[-1].append(line)
+        else:
+            groups.append([line])
+
+    merged = []
+    for group in groups:
+        coord = sum(line[0] for line in group) / float(len(group))
+        spans = []
+        for __, start, end in sorted(group, key=lambda line: line[1]):
+            if spans and start <= spans[-1][1] + line_tol:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+        for start, end in spans:
+            if direction == "vertical":
+                merged.append((coord, start, coord, end))
+            else:
+                merged.append((start, coord, end, coord))
+    return merged
+
+
+def find_vector_joints(bboxes, v_segments, h_segments, joint_tol=2):
+    """Finds joints/intersections of line segments present inside
+    each table boundary.
+
+    Parameters
+    ----------
+    bboxes : list
+        List of tuples representing table boundaries of the form
+        (x1, y1, x2, y2) where (x1, y1) -> lb and (x2, y2) -> rt in
+        PDFMiner coordinate space. If None, table boundaries are
+        guessed from groups of intersecting line segments.
+    v_segments : list
+        List of vertical line segments.
+    h_segments : list
+        List of horizontal line segments.
+    joint_tol : int, optional (default: 2)
+        Tolerance parameter used to decide whether two line segments
+        intersect.
+
+    Returns
+    -------
+    tables : dict
+        Dict with table boundaries as keys and list of intersections
+        in that boundary as their value.
+        Keys are of the form (x1, y1, x2, y2) where (x1, y1) -> lb
+        and (x2, y2) -> rt in PDFMiner coordinate space.
+
+    """
+    if not v_segments or not h_segments:
+        return {}
+
+    v = np.array(v_segments, dtype=float)
+    h = np.array(h_segments, dtype=float)
+    # intersections[i, j] is True when v_segments[i] crosses h_segments[j]
+    intersections = (
+        (h[:, 0] - joint_tol <= v[:, 0, None])
+        & (v[:, 0, None] <= h[:, 2] + joint_tol)
+        & (v[:, 1, None] - joint_tol <= h[:, 1])
+        & (h[:, 1] <= v[:, 3, None] + joint_tol)
+    )
+    v_idx, h_idx = np.nonzero(intersections)
+    joints = np.column_stack([v[v_idx, 0], h[h_idx, 1]])
+
+    if bboxes is None:
+        # group segments connected through joints, like contours of a
+        # line mask would
+        parent = list(range(len(v_segments) + len(h_segments)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in zip(v_idx, h_idx):
+            parent[find(i)] = find(len(v_segments) + j)
+
+        groups = {}
+        for i in set(v_idx) | set(len(v_segments) + j for j in h_idx):
+            groups.setdefault(find(i), []).append(i)
+        bboxes = []
+        for members in groups.values():
+            xs, ys = [], []
+            for i in members:
+                if i < len(v_segments):
+                    s = v_segments[i]
+                else:
+                    s = h_segments[i - len(v_segments)]
+                xs.extend([s[0], s[2]])
+                ys.extend([s[1], s[3]])
+            bboxes.append((min(xs), min(ys), max(xs), max(ys)))
+        # use the 10 largest boundaries
+        bboxes = sorted(
+            bboxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True
+        )[:10]
+
+    tables = {}
+    for x1, y1, x2, y2 in bboxes:
+        inside = (
+            (x1 - joint_tol <= joints[:, 0])
+            & (joints[:, 0] <= x2 + joint_tol)
+            & (y1 - joint_tol <= joints[:, 1])
+            & (joints[:, 1] <= y2 + joint_tol)
+        )
+        if inside.sum() <= 4:  # remove boundaries with less than 4 joints
+            continue
+        tables[(x1, y1, x2, y2)] = [tuple(j) for j in joints[inside].tolist()]
+    return tables
+
+
 def text_strip(text, strip=""):
     """Strips any characters in `strip` that are present in `text`.
     Parameters
@@ -527,11 +968,10 @@ def split_textline(table, textline, direction, flag_size=False, strip_text=""):
                 if r[1] <= (bbox[1] + bbox[3]) / 2 <= r[0]
             ]
             r = r_idx[0]
-            x_cuts = [
-                (c, table.cells[r][c].x2) for c in x_overlap if table.cells[r][c].right
-            ]
+            right = table._grid["right"]
+            x_cuts = [(c, table.cols[c][1]) for c in x_overlap if right[r, c]]
             if not x_cuts:
-                x_cuts = [(x_overlap[0], table.cells[r][-1].x2)]
+                x_cuts = [(x_overlap[0], table.cols[-1][1])]
             for obj in textline._objs:
                 row = table.rows[r]
                 for cut in x_cuts:
@@ -560,11 +1000,10 @@ def split_textline(table, textline, direction, flag_size=False, strip_text=""):
                 if c[0] <= (bbox[0] + bbox[2]) / 2 <= c[1]
             ]
             c = c_idx[0]
-            y_cuts = [
-                (r, table.cells[r][c].y1) for r in y_overlap if table.cells[r][c].bottom
-            ]
+            bottom = table._grid["bottom"]
+            y_cuts = [(r, table.rows[r][1]) for r in y_overlap if bottom[r, c]]
             if not y_cuts:
-                y_cuts = [(y_overlap[0], table.cells[-1][c].y1)]
+                y_cuts = [(y_overlap[0], table.rows[-1][1])]
             for obj in textline._objs:
                 col = table.cols[c]
                 for cut in y_cuts:
@@ -683,27 +1122,158 @@ def get_table_index(
     charea = X * Y
     error = ((X * (y0_offset + y1_offset)) + (Y * (x0_offset + x1_offset))) / charea
 
+    return (
+        _get_cell_text(
+            table,
+            t,
+            r_idx,
+            c_idx,
+            direction,
+            split_text=split_text,
+            flag_size=flag_size,
+            strip_text=strip_text,
+        ),
+        error,
+    )
+
+
+def _get_cell_text(
+    table, t, r_idx, c_idx, direction, split_text=False, flag_size=False, strip_text=""
+):
+    """Returns the text of a text object assigned to a table cell,
+    see get_table_index.
+    """
     if split_text:
-        return (
-            split_textline(
-                table, t, direction, flag_size=flag_size, strip_text=strip_text
-            ),
-            error,
+        return split_textline(
+            table, t, direction, flag_size=flag_size, strip_text=strip_text
         )
     else:
         if flag_size:
-            return (
-                [
-                    (
-                        r_idx,
-                        c_idx,
-                        flag_font_size(t._objs, direction, strip_text=strip_text),
-                    )
-                ],
-                error,
-            )
+            return [
+                (
+                    r_idx,
+                    c_idx,
+                    flag_font_size(t._objs, direction, strip_text=strip_text),
+                )
+            ]
         else:
-            return [(r_idx, c_idx, text_strip(t.get_text(), strip_text))], error
+            return [(r_idx, c_idx, text_strip(t.get_text(), strip_text))]
+
+
+def get_table_indices(
+    table, text, direction, split_text=False, flag_size=False, strip_text=""
+):
+    """Gets indices of the table cells where given text objects lie,
+    like get_table_index does for a single text object, by comparing
+    the coordinates of all text objects with all rows and columns at
+    once.
+
+    Parameters
+    ----------
+    table : camelot.core.Table
+    text : list
+        List of PDFMiner LTTextLine objects.
+    direction : string
+        Direction of the PDFMiner LTTextLine objects.
+    split_text : bool, optional (default: False)
+        Whether or not to split a text line if it spans across
+        multiple cells.
+    flag_size : bool, optional (default: False)
+        Whether or not to highlight a substring using <s></s>
+        if its size is different from rest of the string. (Useful for
+        super and subscripts)
+    strip_text : str, optional (default: '')
+        Characters that should be stripped from a string before
+        assigning it to a cell.
+
+    Returns
+    -------
+    indices : list
+        List with one list of tuples of the form (r_idx, c_idx, text)
+        for each text object.
+    errors : numpy.ndarray
+        Assignment error of each text object, see get_table_index.
+
+    """
+    if not text:
+        return [], np.zeros(0)
+
+    x0, y0, x1, y1 = np.array([(t.x0, t.y0, t.x1, t.y1) for t in text], dtype=float).T
+    rows = np.array(table.rows, dtype=float)
+    cols = np.array(table.cols, dtype=float)
+    top, bottom = rows[:, 0], rows[:, 1]
+    left, right = cols[:, 0], cols[:, 1]
+    y_mid = (y0 + y1) / 2.0
+
+    # find the first row with bottom < y_mid < top
+    if np.all(np.diff(top) <= 0) and np.all(np.diff(bottom) <= 0):
+        # rows are ordered top to bottom, the first row whose bottom
+        # lies below y_mid is the only candidate
+        r_idx = np.searchsorted(-bottom, -y_mid, side="right")
+        found = r_idx < len(rows)
+        found[found] = y_mid[found] < top[r_idx[found]]
+    else:
+        in_row = (bottom < y_mid[:, None]) & (y_mid[:, None] < top)
+        r_idx = np.argmax(in_row, axis=1)
+        found = in_row.any(axis=1)
+    r_idx = np.where(found, r_idx, -1)
+
+    # the column with the largest overlap relative to its width wins
+    overlaps = (left <= x1[:, None]) & (right >= x0[:, None])
+    lo = np.where(left <= x0[:, None], x0[:, None], left)
+    hi = np.where(right >= x1[:, None], x1[:, None], right)
+    width = np.abs(left - right)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        col_overlap = np.where(overlaps, np.abs(lo - hi) / width, -1)
+    c_idx = np.where(found, np.argmax(col_overlap, axis=1), -1)
+    # zero width columns would make get_table_index divide by zero
+    fallback = found & (overlaps & (width == 0)).any(axis=1)
+
+    # error calculation
+    y0_offset = np.where(y0 > top[r_idx], np.abs(y0 - top[r_idx]), 0)
+    y1_offset = np.where(y1 < bottom[r_idx], np.abs(y1 - bottom[r_idx]), 0)
+    x0_offset = np.where(x0 < left[c_idx], np.abs(x0 - left[c_idx]), 0)
+    x1_offset = np.where(x1 > right[c_idx], np.abs(x1 - right[c_idx]), 0)
+    X = np.where(np.abs(x0 - x1) == 0.0, 1.0, np.abs(x0 - x1))
+    Y = np.where(np.abs(y0 - y1) == 0.0, 1.0, np.abs(y0 - y1))
+    charea = X * Y
+    errors = ((X * (y0_offset + y1_offset)) + (Y * (x0_offset + x1_offset))) / charea
+
+    indices = []
+    for i, t in enumerate(text):
+        if fallback[i]:
+            t_indices, errors[i] = get_table_index(
+                table,
+                t,
+                direction,
+                split_text=split_text,
+                flag_size=flag_size,
+                strip_text=strip_text,
+            )
+            indices.append(t_indices)
+            continue
+        if found[i] and not overlaps[i].any():
+            t_text = t.get_text().strip("\n")
+            text_range = (t.x0, t.x1)
+            col_range = (table.cols[0][0], table.cols[-1][1])
+            warnings.warn(
+                "{} {} does not lie in column range {}".format(
+                    t_text, text_range, col_range
+                )
+            )
+        indices.append(
+            _get_cell_text(
+                table,
+                t,
+                int(r_idx[i]),
+                int(c_idx[i]),
+                direction,
+                split_text=split_text,
+                flag_size=flag_size,
+                strip_text=strip_text,
+            )
+        )
+    return indices, errors
 
 
 def compute_accuracy(error_weights):
@@ -774,8 +1344,8 @@ def get_page_layout(
 
     Parameters
     ----------
-    filename : string
-        Path to pdf file.
+    filename : string or file-like object
+        Path to pdf file or a binary file-like object containing it.
     char_margin : float
     line_margin : float
     word_margin : float
@@ -790,7 +1360,12 @@ def get_page_layout(
         Dimension of pdf page in the form (width, height).
 
     """
-    with open(filename, "rb") as f:
+    if hasattr(filename, "read"):
+        f = filename
+        f.seek(0)
+    else:
+        f = open(filename, "rb")
+    try:
         parser = PDFParser(f)
         document = PDFDocument(parser)
         if not document.is_extractable:
@@ -812,6 +1387,96 @@ def get_page_layout(
             height = layout.bbox[3]
             dim = (width, height)
         return layout, dim
+    finally:
+        if f is not filename:
+            f.close()
+
+
+class TextLine(object):
+    """Lightweight record of a PDFMiner LTTextLine, whose text is
+    joined from its characters once instead of on every get_text call.
+
+    Parameters
+    ----------
+    textline : object
+        PDFMiner LTTextLine object.
+
+    """
+
+    __slots__ = ("x0", "y0", "x1", "y1", "text", "_objs")
+
+    def __init__(self, textline):
+        self.x0, self.y0, self.x1, self.y1 = textline.bbox
+        self.text = textline.get_text()
+        # LTChar and LTAnno objects, which are split across cells
+        self._objs = textline._objs
+
+    def __repr__(self):
+        return "<TextLine {:.3f},{:.3f},{:.3f},{:.3f} {!r}>".format(
+            self.x0, self.y0, self.x1, self.y1, self.text
+        )
+
+    @property
+    def bbox(self):
+        return (self.x0, self.y0, self.x1, self.y1)
+
+    @property
+    def width(self):
+        return self.x1 - self.x0
+
+    @property
+    def height(self):
+        return self.y1 - self.y0
+
+    def get_text(self):
+        return self.text
+
+    def is_empty(self):
+        return self.width <= 0 or self.height <= 0
+
+
+_LTYPES = [
+    ("char", LTChar),
+    ("image", LTImage),
+    ("curve", LTCurve),
+    ("horizontal_text", LTTextLineHorizontal),
+    ("vertical_text", LTTextLineVertical),
+]
+
+
+def flatten_layout(layout):
+    """Walks a pdf layout once to get the objects that
+    get_text_objects returns for each ltype, with text lines
+    replaced by TextLine records.
+
+    Parameters
+    ----------
+    layout : object
+        PDFMiner LTPage object.
+
+    Returns
+    -------
+    objects : dict
+        Dict with a list of objects for each of 'char', 'image',
+        'curve', 'horizontal_text' and 'vertical_text', in the order
+        in which get_text_objects would return them.
+
+    """
+    objects = dict((ltype, []) for ltype, __ in _LTYPES)
+
+    def walk(container):
+        for obj in getattr(container, "_objs", ()):
+            for ltype, LTObject in _LTYPES:
+                if isinstance(obj, LTObject):
+                    if ltype.endswith("_text"):
+                        obj = TextLine(obj)
+                    objects[ltype].append(obj)
+                    break
+            # text lines hold the characters
+            walk(obj)
+
+    walk(layout)
+    return objects
 
 
 def get_text_objects(layout, ltype="char", t=None):
@@ -824,7 +1489,8 @@ def get_text_objects(layout, ltype="char", t=None):
         PDFMiner LTPage object.
     ltype : string
         Specify 'char', 'lh', 'lv' to get LTChar, LTTextLineHorizontal,
-        and LTTextLineVertical objects respectively.
+        and LTTextLineVertical objects respectively. 'curve' returns
+        LTCurve objects, which include LTLine and LTRect.
     t : list
 
     Returns
@@ -837,6 +1503,8 @@ def get_text_objects(layout, ltype="char", t=None):
         LTObject = LTChar
     elif ltype == "image":
         LTObject = LTImage
+    elif ltype == "curve":
+        LTObject = LTCurve
     elif ltype == "horizontal_text":
         LTObject = LTTextLineHorizontal
     elif ltype == "vertical_text":
@@ -169,3 +169,50 @@ def test_cli_quiet():
             cli, ["--quiet", "--format", "csv", "--output", outfile, "stream", infile]
         )
         assert "No tables found on page-1" not in result.output
+
+
+def test_cli_batch():
+    with TemporaryDirectory() as tempdir:
+        infiles = [
+            os.path.join(testdir, "budget.pdf"),
+            os.path.join(testdir, "missing.pdf"),
+        ]
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            ["--format", "csv", "--output", tempdir, "batch", "-F", "stream"]
+            + infiles,
+        )
+        assert result.exit_code == 1
+        assert "budget.pdf: found 1 tables" in result.output
+        assert "missing.pdf: failed" in result.output
+        assert os.listdir(tempdir) == ["budget-page-1-table-1.csv"]
+
+        result = runner.invoke(cli, ["--format", "csv", "batch", infiles[0]])
+        output_error = "Error: Please specify output directory using --output"
+        assert output_error in result.output
+
+        infiles = [infiles[0], os.path.join(testdir, "tabula", "budget.pdf")]
+        result = runner.invoke(
+            cli, ["--format", "csv", "--output", tempdir, "batch"] + infiles
+        )
+        assert result.exit_code == 2
+        assert "would overwrite each other's output" in result.output
+
+
+def test_cli_batch_workers(monkeypatch):
+    kwargs = []
+
+    def read_pdfs(filepaths, **kw):
+        kwargs.append(kw)
+        return iter([])
+
+    monkeypatch.setattr("camelot.cli.read_pdfs", read_pdfs)
+    runner = CliRunner()
+    for args in [[], ["--workers", "3"]]:
+        result = runner.invoke(
+            cli, args + ["--format", "csv", "--output", "out", "batch", "a.pdf"]
+        )
+        assert result.exit_code == 0
+    assert "workers" not in kwargs[0]
+    assert kwargs[1]["workers"] == 3
@@ -1,17 +1,88 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
-
+import sys
+import shutil
+import tempfile
+import threading
+import contextlib
+
+import pytest
+import numpy as np
 import pandas as pd
 
 import camelot
-from camelot.core import Table, TableList
+from camelot.cache import LAYERS, Cache
+from camelot.core import Table, TableList, TextEdge, TextEdges, _snap
+from camelot.handlers import PDFHandler
+from camelot.parsers import Lattice, Stream
+from camelot.profiling import Profiler, _reset_peak_rss
+from camelot.rasterizer import A4, Rasterizer, _get_runs, image_bytes
+from camelot.utils import (
+    get_page_layout,
+    get_text_objects,
+    flatten_layout,
+    get_table_index,
+    get_table_indices,
+    segments_in_bbox,
+    text_in_bbox,
+    download_url,
+    SegmentIndex,
+    TextIndex,
+)
 
 from .data import *
 
 testdir = os.path.dirname(os.path.abspath(__file__))
 testdir = os.path.join(testdir, "files")
 
+if sys.version_info[0] >= 3:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+else:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+
+class _FileRequestHandler(BaseHTTPRequestHandler):
+    # serves files from testdir
+    def do_GET(self):
+        with open(os.path.join(testdir, self.path.lstrip("/")), "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", self.server.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def _http_server(content_type="application/pdf"):
+    """Local stand-in for a server hosting PDFs, yields its URL."""
+    server = HTTPServer(("127.0.0.1", 0), _FileRequestHandler)
+    server.content_type = content_type
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/".format(server.server_port)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _FakeTextLine(object):
+    # has what text edges and stream row grouping need from text lines
+    def __init__(self, x0, x1, y0, y1=None, text="text"):
+        self.x0, self.x1, self.y0 = x0, x1, y0
+        self.y1 = y0 + 8 if y1 is None else y1
+        self.text = text
+
+    def get_text(self):
+        return self.text
+
 
 def test_parsing_report():
     parsing_report = {"accuracy": 99.02, "whitespace": 12.24, "order": 1, "page": 1}
@@ -151,6 +222,51 @@ def test_lattice():
     assert df.equals(tables[0].df)
 
 
+def test_lattice_resolution_auto():
+    df = pd.DataFrame(data_lattice)
+
+    filename = os.path.join(
+        testdir, "tabula/icdar2013-dataset/competition-dataset-us/us-030.pdf"
+    )
+    tables = camelot.read_pdf(filename, pages="2", resolution="auto")
+    assert df.equals(tables[0].df)
+
+
+def test_lattice_in_memory_page(tmpdir):
+    # pages are named like the single page files they stand in for
+    filename = os.path.join(str(tmpdir), "page-1.pdf")
+    shutil.copy(os.path.join(testdir, "foo.pdf"), filename)
+    with open(filename, "rb") as f:
+        page_file = io.BytesIO(f.read())
+    page_file.name = "page-1.pdf"
+    tables = Lattice().extract_tables(page_file, suppress_stdout=True)
+    expected = Lattice().extract_tables(filename, suppress_stdout=True)
+    assert len(tables) == len(expected) == 1
+    assert tables[0].df.equals(expected[0].df)
+
+
+def test_rasterizer_render(tmpdir):
+    # pages rendered together from the original PDF give the same
+    # tables as pages that are split out and rendered one at a time
+    for name, password, pages in [
+        ("tabula/icdar2013-dataset/competition-dataset-us/us-030.pdf", None, "1-3"),
+        ("health_protected.pdf", "ownerpass", "1"),
+    ]:
+        filename = os.path.join(testdir, name)
+        with PDFHandler(filename, pages=pages, password=password) as handler:
+            rasterizer = Rasterizer(handler.filepath, password=handler.password)
+            images = rasterizer.render(handler.pages, str(tmpdir))
+            assert sorted(images) == handler.pages
+            for page in handler.pages:
+                tables = handler._parse_page(
+                    page, Lattice(), suppress_stdout=True, image=images[page]
+                )
+                expected = handler._parse_page(page, Lattice(), suppress_stdout=True)
+                assert len(tables) == len(expected)
+                for table, expected_table in zip(tables, expected):
+                    assert table.df.equals(expected_table.df)
+
+
 def test_lattice_table_rotated():
     df = pd.DataFrame(data_lattice_table_rotated)
 
@@ -222,6 +338,45 @@ def test_lattice_shift_text():
     assert df_rb.equals(tables[0].df)
 
 
+def test_lattice_vector_lines():
+    df = pd.DataFrame(data_lattice)
+
+    filename = os.path.join(
+        testdir, "tabula/icdar2013-dataset/competition-dataset-us/us-030.pdf"
+    )
+    tables = camelot.read_pdf(filename, pages="2", line_source="vector")
+    assert df.equals(tables[0].df)
+
+    df1 = pd.DataFrame(data_lattice_two_tables_1)
+    df2 = pd.DataFrame(data_lattice_two_tables_2)
+
+    filename = os.path.join(testdir, "twotables_2.pdf")
+    tables = camelot.read_pdf(filename, line_source="vector")
+    assert len(tables) == 2
+    assert df1.equals(tables[0].df)
+    assert df2.equals(tables[1].df)
+
+
+def test_lattice_vector_table_areas():
+    df = pd.DataFrame(data_lattice_table_areas)
+
+    filename = os.path.join(testdir, "twotables_2.pdf")
+    tables = camelot.read_pdf(
+        filename, table_areas=["80,693,535,448"], line_source="vector"
+    )
+    assert df.equals(tables[0].df)
+
+
+def test_lattice_vector_shift_text():
+    df_rb = pd.DataFrame(data_lattice_shift_text_right_bottom)
+
+    filename = os.path.join(testdir, "column_span_2.pdf")
+    tables = camelot.read_pdf(
+        filename, line_scale=40, shift_text=["r", "b"], line_source="auto"
+    )
+    assert df_rb.equals(tables[0].df)
+
+
 def test_repr():
     filename = os.path.join(testdir, "foo.pdf")
     tables = camelot.read_pdf(filename)
@@ -297,3 +452,462 @@ def test_table_order():
         (1, 2),
         (1, 1),
     ]
+
+
+def test_stream_workers():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    tables = camelot.read_pdf(filename, pages="all", flavor="stream")
+    parallel_tables = camelot.read_pdf(
+        filename, pages="all", flavor="stream", workers=2
+    )
+
+    assert len(tables) == len(parallel_tables)
+    for table, parallel_table in zip(tables, parallel_tables):
+        assert (table.page, table.order) == (parallel_table.page, parallel_table.order)
+        assert table.df.equals(parallel_table.df)
+
+
+def test_iter_pdf():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    tables = camelot.read_pdf(filename, pages="all", flavor="stream")
+
+    for workers in [1, 2]:
+        iter_tables = camelot.iter_pdf(
+            filename, pages="all", flavor="stream", workers=workers
+        )
+        assert not isinstance(iter_tables, list)
+        iter_tables = list(iter_tables)
+        assert len(tables) == len(iter_tables)
+        for table, iter_table in zip(tables, iter_tables):
+            assert (table.page, table.order) == (iter_table.page, iter_table.order)
+            assert table.df.equals(iter_table.df)
+
+
+def test_keep_debug():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    tables = camelot.read_pdf(filename, pages="2", flavor="stream")
+    debug_tables = camelot.read_pdf(
+        filename, pages="2", flavor="stream", keep_debug=True
+    )
+
+    table, debug_table = tables[0], debug_tables[0]
+    assert not hasattr(table, "_text")
+    assert table._load_debug()._text == debug_table._text
+    assert len(table._textedges) == len(debug_table._textedges)
+    assert debug_table._load_debug() is debug_table
+
+
+def test_profile():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    records = []
+    tables = camelot.read_pdf(filename, pages="2,3", flavor="stream", profile=True)
+    camelot.read_pdf(filename, pages="2,3", flavor="stream", profile=records.append)
+
+    profile = tables[0].parsing_report["profile"]
+    stages = [r["stage"] for r in profile]
+    # pdfminer runs while the page is saved, its layout is handed over
+    assert stages[:4] == ["layout", "save_page", "flatten_layout", "detect_tables"]
+    assert stages[-1] == "page"
+    assert all(r["page"] == 2 and r["time"] >= 0 for r in profile)
+    assert profile[2]["counters"]["horizontal_text"] > 0
+    assert [r["stage"] for r in records if r["page"] == 2] == stages
+    assert {r["page"] for r in records} == {2, 3}
+
+    tables = camelot.read_pdf(filename, pages="2", flavor="stream")
+    assert "profile" not in tables[0].parsing_report
+
+
+@pytest.mark.skipif(
+    not _reset_peak_rss(), reason="requires a resettable memory high-water mark"
+)
+def test_profile_peak_rss():
+    # each stage reports its own peak, not that of the whole process
+    size = 256 * 2 ** 20
+    profiler = Profiler()
+    with profiler.stage("outer"):
+        with profiler.stage("large"):
+            a = np.ones(size // 8)
+            del a
+        with profiler.stage("small"):
+            pass
+    large, small, outer = profiler.records
+    assert large["peak_rss"] - small["peak_rss"] > size // 2
+    assert outer["peak_rss"] >= large["peak_rss"]
+
+
+def test_cache(tmpdir, monkeypatch):
+    filename = os.path.join(testdir, "foo.pdf")
+    cachedir = str(tmpdir)
+
+    def n_entries(layer):
+        return len(os.listdir(os.path.join(cachedir, layer)))
+
+    tables = camelot.read_pdf(filename, line_source="vector", cache=cachedir)
+    cached_tables = camelot.read_pdf(filename, line_source="vector", cache=cachedir)
+    assert tables[0].df.equals(cached_tables[0].df)
+    assert [n_entries(layer) for layer in LAYERS] == [1, 0, 1, 1]
+
+    # only the tables are computed again
+    tables = camelot.read_pdf(
+        filename, line_source="vector", shift_text=["r"], cache=cachedir
+    )
+    assert [n_entries(layer) for layer in LAYERS] == [1, 0, 1, 2]
+    assert tables[0].df.equals(
+        camelot.read_pdf(filename, line_source="vector", shift_text=["r"])[0].df
+    )
+
+    # entries of other camelot versions aren't reused
+    monkeypatch.setattr("camelot.cache.__version__", "0.0.0")
+    tables = camelot.read_pdf(filename, line_source="vector", cache=cachedir)
+    assert [n_entries(layer) for layer in LAYERS] == [2, 0, 2, 3]
+
+
+def test_cache_eviction(tmpdir, monkeypatch):
+    cache = Cache(str(tmpdir.mkdir("small")), max_size={"tables": 100})
+    cache.set("tables", "a", b"x" * 60)
+    cache.set("tables", "b", b"x" * 60)
+    assert cache.get("tables", "a") is None
+    assert cache.get("tables", "b") == b"x" * 60
+
+    # a layer is scanned on the first write and when it outgrows its
+    # maximum size, not on every write
+    scans = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: scans.append(path) or listdir(path))
+    cachedir = str(tmpdir.mkdir("large"))
+    cache = Cache(cachedir, max_size={"tables": 20000})
+    for i in range(1000):
+        cache.set("tables", str(i), b"x" * 50)
+    layerdir = os.path.join(cachedir, "tables")
+    sizes = [
+        os.path.getsize(os.path.join(layerdir, name)) for name in listdir(layerdir)
+    ]
+    assert len(scans) < 50
+    assert 15000 < sum(sizes) <= 20000
+    assert cache._sizes["tables"] == sum(sizes)
+
+
+def test_sweep():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    grid = {"row_tol": [2, 10], "column_tol": [0, 5]}
+    results = camelot.sweep(filename, grid, pages="all", flavor="stream")
+
+    assert [r["params"] for r in results] == [
+        {"column_tol": 0, "row_tol": 2},
+        {"column_tol": 0, "row_tol": 10},
+        {"column_tol": 5, "row_tol": 2},
+        {"column_tol": 5, "row_tol": 10},
+    ]
+    tables = camelot.read_pdf(
+        filename, pages="all", flavor="stream", row_tol=10, column_tol=5
+    )
+    assert results[3]["n_tables"] == len(tables)
+    assert results[3]["reports"] == [t.parsing_report for t in tables]
+
+
+def test_read_pdfs():
+    filenames = [
+        os.path.join(testdir, "tabula/eu-017.pdf"),
+        os.path.join(testdir, "missing.pdf"),
+        os.path.join(testdir, "budget.pdf"),
+    ]
+    results = camelot.read_pdfs(
+        iter(filenames), pages="all", flavor="stream", workers=2, max_pending=1
+    )
+
+    results = list(results)
+    assert [r[0] for r in results] == filenames
+    assert isinstance(results[1][1], IOError)
+    for filename, tables in [results[0], results[2]]:
+        expected = camelot.read_pdf(filename, pages="all", flavor="stream")
+        assert len(tables) == len(expected)
+        for table, expected_table in zip(tables, expected):
+            assert table.df.equals(expected_table.df)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason="requires Python 3.5")
+def test_aio_read_pdf():
+    import asyncio
+    from camelot import aio
+
+    filename = os.path.join(testdir, "budget.pdf")
+    expected = camelot.read_pdf(filename, flavor="stream")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        with _http_server() as url:
+            tasks = [
+                loop.create_task(aio.read_pdf(url + "budget.pdf", flavor="stream")),
+                loop.create_task(aio.read_pdf(filename, flavor="stream")),
+            ]
+            loop.run_until_complete(asyncio.wait(tasks))
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    for task in tasks:
+        tables = task.result()
+        assert len(tables) == len(expected)
+        assert tables[0].df.equals(expected[0].df)
+
+
+def test_download_url(tmpdir, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmpdir))
+    filename = os.path.join(testdir, "foo.pdf")
+
+    with _http_server() as url:
+        filepath = download_url(url + "foo.pdf", buffer_size=1024)
+        with pytest.raises(ValueError, match="larger than max_size"):
+            download_url(url + "foo.pdf", max_size=1024)
+    with open(filepath, "rb") as f, open(filename, "rb") as g:
+        assert f.read() == g.read()
+    os.remove(filepath)
+
+    with _http_server(content_type="text/html") as url:
+        with pytest.raises(NotImplementedError, match="File format not supported"):
+            download_url(url + "foo.pdf")
+    # nothing is left behind when a download fails
+    assert tmpdir.listdir() == []
+
+
+def test_downloaded_file_removed(tmpdir, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmpdir))
+    filename = os.path.join(testdir, "foo.pdf")
+    expected = camelot.read_pdf(filename, flavor="stream")
+
+    with _http_server() as url:
+        tables = camelot.read_pdf(url + "foo.pdf", flavor="stream")
+        assert tmpdir.listdir() == []
+        assert tables[0].df.equals(expected[0].df)
+
+        # also when tables are left unconsumed
+        next(camelot.iter_pdf(url + "foo.pdf", flavor="stream"))
+        assert tmpdir.listdir() == []
+
+        # nothing is downloaded till the first table is asked for
+        iter_tables = camelot.iter_pdf(url + "foo.pdf", flavor="stream")
+        assert tmpdir.listdir() == []
+        assert next(iter_tables).df.equals(expected[0].df)
+        iter_tables.close()
+        assert tmpdir.listdir() == []
+
+        handler = PDFHandler(url + "foo.pdf")
+        assert os.path.exists(handler.filepath)
+        handler.close()
+        assert tmpdir.listdir() == []
+
+
+def test_handler_closes_file():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    handler = PDFHandler(filename, pages="all")
+    assert handler.pages == [1, 2, 3]
+
+    tables = handler.parse(flavor="stream")
+    assert len(tables) == 4
+    assert handler._session._fileobj is None
+
+
+def test_handler_reuses_layout():
+    filename = os.path.join(testdir, "foo.pdf")
+    handler = PDFHandler(filename)
+
+    page_file, layout, rotation = handler._save_page(1)
+    assert page_file.name == "page-1.pdf"
+    assert layout is not None
+
+    # the rotation pass can't stand in for a layout without vertical text
+    page_file, layout, rotation = handler._save_page(
+        1, layout_kwargs={"detect_vertical": False}
+    )
+    assert layout is None
+
+    filename = os.path.join(testdir, "clockwise_table_2.pdf")
+    handler = PDFHandler(filename)
+    page_file, layout, rotation = handler._save_page(1)
+    assert rotation == "clockwise"
+    assert layout is None
+
+
+def test_rasterizer_batches():
+    rasterizer = Rasterizer("foo.pdf", batch_size=3)
+    assert rasterizer.batches([1, 2, 3, 4, 5, 7]) == [[1, 2, 3], [4, 5, 7]]
+    assert rasterizer.batches([1, 2, 3, 4], size=2) == [[1, 2], [3, 4]]
+    assert _get_runs([1, 2, 3, 5, 7, 8]) == [(1, 3), (5, 5), (7, 8)]
+
+    # batches are also bounded by the size of their images, a page
+    # that is larger gets a batch of its own
+    rasterizer = Rasterizer("foo.pdf", max_bytes=3 * image_bytes(A4, 300))
+    page_sizes = {3: (6624, 6624)}
+    assert rasterizer.batches([1, 2, 3, 4, 5, 6, 7], page_sizes=page_sizes) == [
+        [1, 2],
+        [3],
+        [4, 5, 6],
+        [7],
+    ]
+
+
+def test_parse_batch_removes_images(monkeypatch):
+    # each image is removed once its page has been parsed
+    class FakeRasterizer(object):
+        def render(self, pages, imagedir):
+            images = {}
+            for p in pages:
+                images[p] = os.path.join(imagedir, "page-{}.png".format(p))
+                open(images[p], "wb").close()
+            return images
+
+    existing = {}
+
+    def parse_page(page, parser, image=None, **kwargs):
+        imagedir = os.path.dirname(image)
+        existing[page] = sorted(os.listdir(imagedir))
+        if page == 2:
+            raise ValueError("bad page")
+        return []
+
+    filename = os.path.join(testdir, "foo.pdf")
+    with PDFHandler(filename) as handler:
+        monkeypatch.setattr(handler, "_parse_page", parse_page)
+        results = handler._parse_batch(
+            [1, 2, 3], Lattice(), FakeRasterizer(), True, {}, False
+        )
+    assert [(p, error is None) for p, t, error, profiler in results] == [
+        (1, True),
+        (2, False),
+        (3, True),
+    ]
+    assert existing == {
+        1: ["page-1.png", "page-2.png", "page-3.png"],
+        2: ["page-2.png", "page-3.png"],
+        3: ["page-3.png"],
+    }
+
+
+def test_spatial_index():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    layout, dim = get_page_layout(filename)
+    text = get_text_objects(layout, ltype="horizontal_text")
+    index = TextIndex(text)
+    for bbox in [(0, 0, dim[0], dim[1]), (50, 300, 400, 600), (0, 0, 10, 10)]:
+        assert index.in_bbox(bbox) == text_in_bbox(bbox, text)
+
+    v_segments = [(100, 10, 100, 200), (50, 0, 50, 90), (300, 100, 300, 110)]
+    h_segments = [(0, 100, 300, 100), (40, 20, 60, 20), (10, 300, 20, 300)]
+    index = SegmentIndex(v_segments, h_segments)
+    for bbox in [(0, 0, 400, 400), (45, 0, 105, 210), (200, 50, 350, 150)]:
+        assert index.in_bbox(bbox) == segments_in_bbox(bbox, v_segments, h_segments)
+
+
+def test_flatten_layout():
+    filename = os.path.join(testdir, "superscript.pdf")
+    layout, dim = get_page_layout(filename)
+    objects = flatten_layout(layout)
+    for ltype in ["char", "image", "curve"]:
+        assert objects[ltype] == get_text_objects(layout, ltype=ltype)
+    for ltype in ["horizontal_text", "vertical_text"]:
+        text = get_text_objects(layout, ltype=ltype)
+        assert [t.bbox for t in objects[ltype]] == [t.bbox for t in text]
+        assert [t.get_text() for t in objects[ltype]] == [t.get_text() for t in text]
+        assert [t._objs for t in objects[ltype]] == [t._objs for t in text]
+
+
+def test_get_table_indices():
+    filename = os.path.join(testdir, "tabula/eu-017.pdf")
+    layout, dim = get_page_layout(filename)
+    text = get_text_objects(layout, ltype="horizontal_text")
+    cols = [(30, 120), (120, 121), (121, 250), (250, 400), (400, 580)]
+    rows = [(800, 700), (700, 500), (500, 500), (500, 300), (250, 100)]
+    # rows that aren't ordered top to bottom are looked up differently
+    for rows in [rows, rows[::-1]]:
+        table = Table(cols, rows)
+        indices, errors = get_table_indices(table, text, "horizontal")
+        for t, t_indices, error in zip(text, indices, errors):
+            assert (t_indices, error) == get_table_index(table, t, "horizontal")
+
+
+def test_table_cells():
+    table = Table([(0, 10), (10, 20), (20, 30)], [(30, 20), (20, 10)])
+    table.set_edges([(10, 10, 10, 30)], [(0, 20, 30, 20)])
+    table.set_border().set_span()
+
+    cell = table.cells[0][1]
+    assert repr(cell) == "<Cell x1=10 y1=20 x2=20 y2=30>"
+    assert (cell.left, cell.right, cell.top, cell.bottom) == (True, False, True, True)
+    assert cell.hspan and not cell.vspan
+    assert table.cells[0][0].bound == 4
+
+    # cells are views on the table, text is appended
+    cell.text = "foo"
+    table.cells[0][1].text = "bar"
+    assert table.data == [["", "foobar", ""], ["", "", ""]]
+
+
+def test_snap():
+    coords = np.array([100.0, 10.0, 50.0, 11.5, 300.0])
+    values = np.array([10.5, 51.9, 200.0, 300.0, -5.0])
+    first, count = _snap(values, coords, 2)
+    for value, f, n in zip(values, first, count):
+        matches = [i for i, c in enumerate(coords) if np.isclose(value, c, atol=2)]
+        assert f == (matches[0] if matches else -1)
+        assert n == len(matches)
+
+
+def test_textedges_find():
+    # edges close to each other, which move as text rows are added
+    xs = [10.0, 10.4, 10.8, 50.0, 50.49, 50.51, 10.2, 300.0, 50.2]
+    textlines = [
+        _FakeTextLine(x, x + 40, 500 - 10 * i) for i, x in enumerate(xs * 4)
+    ]
+    textedges = TextEdges()
+    textedges.generate(textlines)
+
+    for align, edges in textedges._textedges.items():
+        for x in [9.4, 10.0, 10.5, 10.9, 50.5, 51.0, 90.3, 300.5, 301.0]:
+            matches = [i for i, te in enumerate(edges) if np.isclose(te.x, x, atol=0.5)]
+            assert textedges.find(x, align) == (matches[0] if matches else None)
+
+
+def test_get_table_areas():
+    textedges = []
+    for x, y0, y1 in [(10, 400, 500), (20, 100, 150), (30, 50, 450)]:
+        te = TextEdge(x, y0, y1)
+        te.is_valid = True
+        textedges.append(te)
+    # the last edge overlaps both areas and grows the first one, which
+    # then overlaps the second one, textlines that lie within both
+    # grow the one that was grown the least recently
+    textlines = [_FakeTextLine(0, 40, 110, 120), _FakeTextLine(5, 60, 115, 125)]
+    table_areas = TextEdges().get_table_areas(textlines, textedges)
+    assert list(table_areas) == [(-10, 90, 50, 200.0), (-5, 40, 70, 550.0)]
+
+
+def test_stream_rows_and_columns():
+    textlines = [
+        _FakeTextLine(10, 40, 500),
+        _FakeTextLine(60, 90, 501),
+        _FakeTextLine(35, 50, 499, text=" "),
+        _FakeTextLine(120, 150, 480),
+        _FakeTextLine(20, 45, 479),
+        _FakeTextLine(60, 95, 478),
+    ]
+    rows = Stream._group_rows(textlines, row_tol=2)
+    assert [[t.x0 for t in r] for r in rows] == [[10, 60], [20, 60, 120]]
+    assert Stream._join_rows(rows, 520, 470) == [
+        (520, 493.75),
+        (493.75, 470),
+    ]
+
+    cols = sorted((t.x0, t.x1) for r in rows for t in r)
+    assert Stream._merge_columns(cols) == [(10, 45), (60, 95), (120, 150)]
+    assert Stream._merge_columns(cols, column_tol=15) == [(10, 95), (120, 150)]
+    assert Stream._merge_columns(cols, column_tol=-1) == [
+        (10, 45),
+        (60, 95),
+        (120, 150),
+    ]
+    assert Stream._join_columns([(10, 45), (60, 95), (120, 150)], 0, 200) == [
+        (0, 52.5),
+        (52.5, 107.5),
+        (107.5, 200),
+    ]
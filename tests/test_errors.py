@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import warnings
 
 import pytest
+from PyPDF2 import PdfFileReader, PdfFileWriter
+from PyPDF2.generic import ArrayObject, NameObject, NumberObject
 
 import camelot
 
@@ -26,6 +29,12 @@ def test_input_kwargs():
         tables = camelot.read_pdf(filename, columns=['10,20,30,40'])
 
 
+def test_sweep_input_kwargs():
+    message = "row_tol cannot be used with flavor='lattice'"
+    with pytest.raises(ValueError, match=message):
+        results = camelot.sweep(filename, {'row_tol': [2, 10]})
+
+
 def test_unsupported_format():
     message = 'File format not supported'
     filename = os.path.join(testdir, 'foo.csv')
@@ -95,3 +104,87 @@ def test_bad_password():
     message = 'file has not been decrypted'
     with pytest.raises(Exception, match=message):
         tables = camelot.read_pdf(filename, password='wrongpass')
+
+
+def test_invalid_workers():
+    message = "workers should be greater than or equal to 1"
+    with pytest.raises(ValueError, match=message):
+        tables = camelot.read_pdf(filename, workers=0)
+    with pytest.raises(ValueError, match=message):
+        tables = camelot.iter_pdf(filename, workers=0)
+
+
+def test_invalid_line_source():
+    message = "Specify line_source as either 'raster', 'vector' or 'auto'"
+    with pytest.raises(ValueError, match=message):
+        tables = camelot.read_pdf(filename, line_source='pixels')
+
+
+def test_worker_page_failure():
+    filename = os.path.join(testdir, 'health_protected.pdf')
+    message = 'file has not been decrypted'
+    for workers in [1, 2]:
+        for suppress_stdout in [False, True]:
+            with pytest.raises(Exception, match=message):
+                tables = camelot.read_pdf(filename, pages='1,2', flavor='stream',
+                    password='wrongpass', workers=workers,
+                    suppress_stdout=suppress_stdout)
+
+
+def test_read_pdfs_page_failure():
+    filename = os.path.join(testdir, 'health_protected.pdf')
+    results = list(camelot.read_pdfs([filename], pages='1,2', flavor='stream',
+        password='wrongpass', workers=2))
+    assert results[0][0] == filename
+    assert str(results[0][1]) == 'file has not been decrypted'
+
+
+def _bad_page_pdf(tmpdir):
+    # foo.pdf on odd pages, and even pages whose media box can't be read
+    with open(filename, 'rb') as f:
+        data = f.read()
+    outfile = PdfFileWriter()
+    for i in range(4):
+        if i % 2 == 0:
+            outfile.addPage(PdfFileReader(io.BytesIO(data)).getPage(0))
+        else:
+            page = outfile.addBlankPage(612, 792)
+            page[NameObject('/MediaBox')] = ArrayObject([NumberObject(0),
+                NumberObject(0), NameObject('/Foo'), NameObject('/Bar')])
+    bad_filename = os.path.join(str(tmpdir), 'bad_page.pdf')
+    with open(bad_filename, 'wb') as f:
+        outfile.write(f)
+    return bad_filename
+
+
+def test_bad_page(tmpdir):
+    bad_filename = _bad_page_pdf(tmpdir)
+    message = ("page-2 could not be parsed: unsupported operand type(s)"
+               " for *: 'int' and 'PSLiteral'")
+    for workers in [1, 2]:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            with pytest.raises(UserWarning) as e:
+                tables = camelot.read_pdf(bad_filename, pages='1-3',
+                    flavor='stream', workers=workers)
+            assert str(e.value) == message
+
+        tables = camelot.read_pdf(bad_filename, pages='1-4', flavor='stream',
+            workers=workers, suppress_stdout=True)
+        assert [t.page for t in tables] == [1, 3]
+
+        # there's nothing left to return when every page fails
+        with pytest.raises(TypeError):
+            tables = camelot.read_pdf(bad_filename, pages='2,4', flavor='stream',
+                workers=workers, suppress_stdout=True)
+
+
+def test_read_pdfs_bad_page(tmpdir):
+    bad_filename = _bad_page_pdf(tmpdir)
+    results = list(camelot.read_pdfs([bad_filename], pages='1-4',
+        flavor='stream', workers=2, suppress_stdout=True))
+    assert [t.page for t in results[0][1]] == [1, 3]
+
+    results = list(camelot.read_pdfs([bad_filename], pages='2,4', flavor='stream',
+        workers=2, suppress_stdout=True))
+    assert isinstance(results[0][1], TypeError)